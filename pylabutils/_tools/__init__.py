@@ -4,8 +4,10 @@ Some tools to have some methods delegated to outside functions for clear code.
 
 from ._colors import color_dict
 from ._add_cols import _add_cols
+from ._derive import _derive
 from ._ffixx import _ffixx
 from ._get_image import _get_image
+from ._compile_func import _compile_func, _find_parms
 from ._ms_methods import *
 # from ._imports import *
 
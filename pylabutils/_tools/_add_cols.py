@@ -1,6 +1,8 @@
 import re
 import pandas
 
+from ._derive import _derive
+
 def _add_cols(df: pandas.DataFrame, scope = (globals(), locals())) -> None:
     """
     A function to add new columns to a dataframe based on interactive user
@@ -26,39 +28,18 @@ def _add_cols(df: pandas.DataFrame, scope = (globals(), locals())) -> None:
     `None`, because its point is to modify the existent database.
 
     """
-    command : str = input("\nAdd a column:\n")
-    if command.lower() in ['n', 'no', 'quit()', 'exit', 'return']:
-        return
-
-    col_name : str = command[ \
-        re.search(r'[\w\.\(\)]+', command).start(): \
-        re.search(r'[\w\.\(\)]+', command).end() \
-        ]
-    # new column's name
-
-    arg : str = command[re.search(r'[=,;]', command).end():]
-    # the new column's "function"
-    ref_cols = re.findall(r'(?<=\{)\w[\w\.\(\)]*(?=\})', arg)
-    # df column names that are referenced to create new columns
-
-    for i in range(len(ref_cols)):
-        arg = re.sub(
-            f'{{{ref_cols[i]}}}',
-            f'df[\'{ref_cols[i]}\']',
-            arg
-            )
-    # substituting references
-
-    scope[0].update(globals())
-    scope[1].update(locals())
+    while True:
+        command : str = input("\nAdd a column:\n")
+        if command.lower() in ['n', 'no', 'quit()', 'exit', 'return']:
+            return
 
-    col_arg = eval(arg, scope[0], scope[1])
-    # pandas.Series for type checking
-    df[col_name] = col_arg
-    # creating column
+        col_name : str = re.search(r'[\w\.\(\)]+', command).group()
+        # new column's name
 
-    more : str = input("\nWould you like to add more columns?\n")
-    if more.lower() in ['y', 'yes', 'continue', 'true']:
-        return _add_cols(df)
-    return
+        arg : str = command[re.search(r'[=,;]', command).end():]
+        # the new column's "function", evaluated as in `derive`
+        _derive(df, {col_name: arg.strip()}, scope = scope)
 
+        more : str = input("\nWould you like to add more columns?\n")
+        if more.lower() not in ['y', 'yes', 'continue', 'true']:
+            return
@@ -0,0 +1,54 @@
+import re
+
+import numpy as np
+
+__all__ = ['_compile_func', '_find_parms']
+
+
+
+def _find_parms(func_str):
+    """
+    Finds the names of the parameters (between curly brackets) in a string
+    function, in order of first appearance and without duplicates.
+    """
+    parms = re.findall(r'(?<=\{)\w[\w\.\(\)]*(?=\})', func_str)
+
+    for parm in parms:
+        if parms.count(parm) > 1:
+            temp = parms[::-1]
+            temp.remove(parm)
+            parms = temp[::-1].copy()
+    # removes all duplicates from the end back
+    return parms
+
+
+
+def _compile_func(func_str, parms = None, scope = (globals(), locals())):
+    """
+    Compiles a string function that complies with the criteria stated in the
+    `fit` method into a callable with the _func_image format, f(x, *values).
+    Unlike `_get_image`, the string is parsed and compiled only once and the
+    values are not written into it as text, so each call is a single
+    vectorized evaluation (values can also be arrays that broadcast with x).
+    """
+    if '=' in func_str:
+        func_str = func_str[func_str.find('=')+1:]
+
+    if parms is None:
+        parms = _find_parms(func_str)
+
+    expr = func_str
+    for i in range(len(parms)):
+        expr = expr.replace(f'{{{parms[i]}}}', f'_beta[{i}]')
+
+    namespace = {'np': np, 'numpy': np}
+    namespace.update(scope[0])
+    namespace.update(scope[1])
+    # one snapshot of the scope, looked up as globals by the compiled code
+
+    image = eval(compile(f'lambda x, *_beta: ({expr.strip()})',
+        '<fit function>', 'eval'), namespace)
+
+    image.func_str = func_str
+    image.parms = list(parms)
+    return image
@@ -0,0 +1,96 @@
+import re
+
+import pandas
+
+__all__ = ['_derive']
+
+
+_ref_re = re.compile(r'\{([^{}]+)\}') # {df_key}
+_name_re = re.compile(r'(?<![\w\.`\'"])[A-Za-z_]\w*')
+
+
+
+def _references(expr, names):
+    """
+    Keys of `names` that `expr` uses, either as `{key}` or as bare names.
+    """
+    used = set(_ref_re.findall(expr))
+    used.update(_name_re.findall(_ref_re.sub('', expr)))
+    return used & set(names)
+
+
+
+def _derive_order(exprs):
+    """
+    Names of the derived columns in an order where every column comes after
+    the ones its expression uses, and otherwise in the order they're given.
+    """
+    pending = {name: set() if callable(expr) \
+        else _references(expr, exprs) - {name} \
+        for name, expr in exprs.items()}
+
+    order = []
+    while pending:
+        ready = [name for name, needs in pending.items() \
+            if not needs & set(pending)]
+        if not ready:
+            raise ValueError("derived columns depend on each other in a"
+                f" cycle: {', '.join(map(str, pending))}")
+        order.append(ready[0])
+        del pending[ready[0]]
+    return order
+
+
+
+def _derive(df: pandas.DataFrame, exprs, scope = (globals(), locals())):
+    """
+    Adds (or replaces) the columns of `df` given by `exprs`, a dict from
+    column name to expression. Expressions reference columns as `{df_key}`
+    or by their bare names, and may use other derived columns, which are
+    computed first. Callables are called with the frame.
+
+    All the expressions go to `DataFrame.eval` at once (numexpr evaluates
+    them if it is installed), which returns a new frame the derived columns
+    are taken from. If that fails (e.g. they use names of `scope`), `df` is
+    left as it was and every expression is evaluated on its own, by
+    `DataFrame.eval` if it can and otherwise as python compiled
+    once, with the names of `scope` and the columns available.
+    """
+    order = _derive_order(exprs)
+    if not order:
+        return
+
+    def _quoted(expr):
+        return _ref_re.sub(lambda ref: f'`{ref.group(1)}`', expr)
+
+    if not any(callable(exprs[name]) for name in order):
+        # not in place: a line failing halfway would leave `df` changed
+        try:
+            derived = df.eval('\n'.join(f'`{name}` = {_quoted(exprs[name])}' \
+                for name in order))
+        except Exception:
+            pass # there are names pandas can't resolve, one at a time then
+        else:
+            for name in order:
+                df[name] = derived[name]
+            return
+
+    namespace = dict(scope[1])
+    namespace.update({name: df[name] for name in df.columns \
+        if isinstance(name, str) and name.isidentifier()})
+    namespace['__df__'] = df
+
+    for name in order:
+        expr = exprs[name]
+        if callable(expr):
+            df[name] = expr(df)
+        else:
+            try:
+                df[name] = df.eval(_quoted(expr))
+            except Exception:
+                code = compile(
+                    _ref_re.sub(lambda ref: f"__df__[{ref.group(1)!r}]", expr),
+                    f'<derive {name}>', 'eval')
+                df[name] = eval(code, scope[0], namespace)
+        if isinstance(name, str) and name.isidentifier():
+            namespace[name] = df[name]
@@ -1,10 +1,34 @@
 import re
 
+__all__ = ['_ffixx', '_find_xvars']
+
+def _find_xvars(func_str : str) -> list:
+    """
+    Finds the names of the independent variables (between square brackets)
+    in a function string, in order of first appearance and without
+    duplicates.
+    """
+    xvars = []
+    for xvar in re.findall(r'(?<=\[)[A-Za-z_][\w\.\(\)]*(?=\])', func_str):
+        if xvar not in xvars:
+            xvars.append(xvar)
+    return xvars
+
+
 def _ffixx(func_str : str, custom_x : str) -> str:
     """
     Finds and replaces a custom named independent variable in a function string
     for the standard 'x', returning the new string.
+    If there are several independent variables between square brackets, they
+    are replaced by the rows of a stacked 'x' instead: 'x[0]', 'x[1]', ...
+    in order of first appearance.
     """
+    xvars = _find_xvars(func_str)
+    if len(xvars) > 1:
+        return re.sub(r'\[([A-Za-z_][\w\.\(\)]*)\]',
+            lambda match: f'x[{xvars.index(match.group(1))}]',
+            func_str)
+
     # identifying the independent variable in the function string
     x_str = custom_x if type(custom_x) == str else 'x'
 
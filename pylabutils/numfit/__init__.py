@@ -1,5 +1,12 @@
 from .fit import fit
+from .batch import fit_batch
+from .peaks import fit_peaks
+from .segments import fit_segments
+from .store import FitStore
+from .binned import bin_chunks, fit_binned
 from . import methods
 
 __all__ = []
 __all__ += methods.__all__
+__all__ += ['fit_batch', 'fit_peaks', 'fit_segments', 'FitStore',
+    'bin_chunks', 'fit_binned']
@@ -0,0 +1,335 @@
+import os
+import time
+import concurrent.futures as cf
+
+import numpy as np
+import scipy.optimize as so
+
+from .methods._odr_fit import _odr_batch, _odr_model
+from .methods._find_beta import _find_beta
+from .methods._fit_result import FitResult, _residual_stats
+from .methods._shared_arrays import _share_arrays, _attach_arrays
+from .methods._telemetry import _telemetry
+
+from .methods.minimize._sqerr_sum import _sqerr_sum
+
+from ..utils.io._print_measure import _print_measure
+
+from .._tools._ffixx import _ffixx
+from .._tools._compile_func import _compile_func, _find_parms
+
+
+__all__ = ['fit_batch']
+
+
+
+def _dataset(data):
+    """
+    Normalizes a dataset given as a dict or as a
+    `(xdata, ydata[, yerr[, xerr]])` tuple into a dict.
+    """
+    if isinstance(data, dict):
+        dataset = dict(yerr = None, xerr = None)
+        dataset.update(data)
+        return dataset
+
+    keys = ['xdata', 'ydata', 'yerr', 'xerr']
+    if not 2 <= len(data) <= 4:
+        raise ValueError("datasets must be (xdata, ydata[, yerr[, xerr]])")
+    dataset = dict(yerr = None, xerr = None)
+    dataset.update(zip(keys, data))
+    return dataset
+
+
+
+def _fit_datasets(_func_image, parms, func, datasets, solver, kwargs):
+    """
+    Fits the datasets one after the other, warm starting each fit from the
+    previous one if asked to. Returns the list of `FitResult`.
+    """
+    fit_method = solver['fit_method']
+    telemetry = _telemetry(kwargs['telemetry'])
+    compiled, _func_image = _func_image, telemetry.counted(_func_image)
+    # one counting function (and ODR model) for every fit, each fit swaps
+    # its own telemetry in
+    if fit_method == 'odr':
+        model = _odr_model(_func_image)
+
+    results = []
+    beta0, previous = kwargs['beta0'], kwargs['odr_restart']
+    for dataset in datasets:
+        if kwargs['telemetry']:
+            telemetry = _telemetry(kwargs['telemetry'])
+            _func_image.telemetry = telemetry
+
+        if fit_method == 'odr':
+            with telemetry.stage('fit'):
+                output, = _odr_batch(model, [dataset],
+                    beta0 = beta0,
+                    odr_restart = previous,
+                    jfit_type = kwargs['jfit_type'],
+                    jderiv = kwargs['jderiv'],
+                    jvar_calc = kwargs['jvar_calc'],
+                    jdel_init = kwargs['jdel_init'],
+                    jrestart = kwargs['jrestart'],
+                    )
+            values, uncertainties = output.beta, output.sd_beta
+            cov = output.cov_beta * output.res_var
+            status, message = int(output.info), '; '.join(output.stopreason)
+            elapsed = output.elapsed
+            if kwargs['warm_start']:
+                previous = output
+
+        elif fit_method == 'simple':
+            start = time.perf_counter()
+            with telemetry.stage('fit'):
+                sols = so.curve_fit(
+                    _func_image, dataset['xdata'], dataset['ydata'],
+                    p0 = beta0,
+                    sigma = dataset['yerr'],
+                    absolute_sigma = kwargs['absolute_err'],
+                    bounds = kwargs['bounds'],
+                    method = kwargs['simple_method'],
+                    jac = kwargs['jac'],
+                    full_output = True,
+                    )
+            elapsed = time.perf_counter() - start
+            output = None
+            values, uncertainties = sols[0], np.sqrt(np.diag(sols[1]))
+            cov = sols[1]
+            status, message = int(sols[4]), sols[3]
+            if kwargs['warm_start']:
+                beta0 = sols[0]
+
+        with telemetry.stage('stats'):
+            dof, res_var, chi2 = _residual_stats(_func_image,
+                dataset['xdata'], dataset['ydata'], values,
+                yerr = dataset['yerr'])
+        telemetry.terminated(message)
+
+        results.append(FitResult(parms, values, uncertainties,
+            solver = dict(solver), odr_output = output, func = func,
+            cov = cov, dof = dof, res_var = res_var, chi2 = chi2,
+            status = status, message = message, elapsed = elapsed,
+            telemetry = telemetry if kwargs['telemetry'] else None,
+            func_image = compiled,
+            yerr = None if dataset['yerr'] is None \
+                else np.array(dataset['yerr']), # may be a shared memory view
+            absolute_err = kwargs['absolute_err']))
+
+    return results
+
+
+
+def _fit_chunk(task):
+    """
+    Worker of the parallel fits: compiles the function and fits a
+    contiguous chunk of datasets, read from shared memory without copies.
+    """
+    _func_image = _compile_func(task['func'], task['parms'])
+    with _attach_arrays(task['datasets']) as datasets:
+        results = _fit_datasets(_func_image, task['parms'], task['func'],
+            datasets, task['solver'], task['kwargs'])
+        del datasets # the views must be gone before the block is closed
+    return results
+
+
+
+def _fit_parallel(parms, func, datasets, solver, kwargs):
+    """
+    Fits the datasets across a pool of processes. The data arrays are
+    copied once into a shared memory block and every worker only receives
+    their descriptors. The datasets are split into contiguous chunks, one
+    per worker, so that warm starts still chain inside every chunk.
+    """
+    processes = kwargs['processes'] or os.cpu_count() or 1
+    arrays = [{key: value if value is None or np.ndim(value) == 0 \
+        else np.asarray(value, dtype = float) \
+        for key, value in dataset.items()} for dataset in datasets]
+
+    # the worker arguments must be picklable, the function is compiled there
+    kwargs = {key: value for key, value in kwargs.items() \
+        if key not in ('printres',)}
+    splits = np.array_split(np.arange(len(arrays)), processes)
+
+    with _share_arrays(arrays) as shared:
+        tasks = [dict(
+            func = func,
+            parms = parms,
+            datasets = [shared[i] for i in chunk],
+            solver = solver,
+            kwargs = kwargs,
+            ) for chunk in splits if len(chunk)]
+
+        with cf.ProcessPoolExecutor(max_workers = len(tasks)) as executor:
+            chunks = list(executor.map(_fit_chunk, tasks))
+
+    return [result for chunk in chunks for result in chunk]
+
+
+
+def fit_batch(func, datasets, scope = (globals(), locals()), **options):
+    """
+    Adjusts many (x, y) datasets to the same curve, compiling the function
+    and building the fit model only once for all of them.
+
+
+    \> Parameters:
+
+
+    `func` : *string*
+
+    Equation of the curve, with the same format as in `fit`.
+
+
+    `datasets` : *N x tuple or N x dict*
+
+    The datasets to fit, either as `(xdata, ydata[, yerr[, xerr]])` tuples
+    or as dicts with the keys `'xdata'`, `'ydata'` and optionally `'yerr'`
+    and `'xerr'`.
+
+
+    `scope` : *`(globals(), locals())`; optional*
+
+    Same as in `fit`.
+
+
+    `fit_method` : *`{'odr', 'simple'}`; optional*
+
+    Method used for every fit. ODR fits share one `scipy.odr.Model`.
+
+    default : `'odr'`
+
+
+    `beta0` : *N x scalar or 'find'; optional*
+
+    First guess for the parameters of the first dataset. If `'find'`, it is
+    searched for in the first dataset as in `fit`.
+
+    default : `'find'`
+
+
+    `warm_start` : *bool; optional*
+
+    Chooses whether each fit starts from the result of the previous one,
+    which saves many iterations when the datasets change only slightly. For
+    ODR fits, the x offsets of the previous fit are reused as well when the
+    datasets have the same shape.
+
+    default : `True`
+
+
+    `processes` : *int or None; optional*
+
+    Amount of worker processes the datasets are fit across. If `None`, as
+    many as CPUs. The data is placed once in shared memory, which the
+    workers read without copies, and every worker fits a contiguous chunk
+    of datasets (warm starting within it). The function is compiled again
+    in every worker, so it can only use numpy (as `np` or `numpy`) besides
+    its parameters and variables.
+
+    default : `1`
+
+
+    `printres` : *bool; optional*
+
+    Chooses whether to print the parameters found for every dataset.
+
+    default : `False`
+
+
+    \> Other options:
+
+    bounds, absolute_err, simple_method, jac, custom_x, res_fmt, jfit_type,
+    jderiv, jvar_calc, jdel_init, jrestart, odr_restart, telemetry, which
+    work as in `fit` (every result gets its own telemetry).
+
+
+    \> Returns:
+
+    A list with one `FitResult` for each dataset, in order.
+
+    """
+
+    kwargs = dict(
+        fit_method = 'odr',
+        beta0 = 'find',
+        warm_start = True,
+        printres = False,
+        processes = 1,
+        bounds = (-np.inf, np.inf),
+        absolute_err = True,
+        simple_method = None,
+        jac = None,
+        custom_x = False,
+        res_fmt = '.2uL',
+        jfit_type = None, # odr kwargs
+        jderiv = None,
+        jvar_calc = None,
+        jdel_init = None,
+        jrestart = None,
+        odr_restart = None, #
+        telemetry = False,
+    ) # default kwargs values
+
+    kwargs.update(options)
+
+    datasets = [_dataset(data) for data in datasets]
+    if not datasets:
+        return []
+
+    func = func[func.find('=')+1:]
+    parms = _find_parms(func)
+    func = _ffixx(func, kwargs['custom_x'])
+
+    _func_image = _compile_func(func, parms, scope = scope)
+
+    search_telemetry = _telemetry(kwargs['telemetry'])
+    if type(kwargs['beta0']) == str and kwargs['beta0'] == 'find':
+        first = datasets[0]
+        search_x = np.asarray(first['xdata'])
+        search_y = np.asarray(first['ydata'])
+        _search_image = search_telemetry.counted(_func_image)
+
+        def _de_func(values):
+            return _sqerr_sum(_search_image, search_x, search_y, *values)
+
+        bounds = kwargs['bounds']
+        if bounds is None or np.all(np.isinf(bounds)):
+            bounds = (-1e9, 1e9)
+        with search_telemetry.stage('find_beta'):
+            kwargs['beta0'] = _find_beta(_search_image, search_x, search_y,
+                _de_func, len(parms), bounds = bounds)
+
+    fit_method = kwargs['fit_method'].lower()
+    solver = dict(
+        fit_method = fit_method,
+        simple_method = kwargs['simple_method'],
+        jac = kwargs['jac'],
+        jderiv = kwargs['jderiv'],
+        reasons = [],
+    )
+
+    if fit_method not in ('odr', 'simple'):
+        raise ValueError(f"{kwargs['fit_method']!r} is not a valid value for"
+            " `fit_method`")
+
+    processes = kwargs['processes']
+    if processes == 1 or len(datasets) <= 1:
+        results = _fit_datasets(_func_image, parms, func, datasets, solver,
+            kwargs)
+    else:
+        results = _fit_parallel(parms, func, datasets, solver, kwargs)
+
+    if kwargs['telemetry'] and 'find_beta' in search_telemetry:
+        # the search is done once, on the first dataset
+        results[0].telemetry.update(search_telemetry)
+
+    if kwargs['printres']:
+        for i, result in enumerate(results):
+            print(f"dataset {i}:")
+            for name, val, unc in \
+                    zip(parms, result.values, result.uncertainties):
+                _print_measure(val, unc, name = name, fmt = kwargs['res_fmt'])
+
+    return results
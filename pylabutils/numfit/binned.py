@@ -0,0 +1,198 @@
+import numpy as np
+import pandas as pd
+
+from .fit import fit
+
+
+__all__ = ['bin_chunks', 'fit_binned']
+
+
+
+def _column(chunk, key):
+    """
+    Column `key` of a chunk, which is a DataFrame (`key` is a column name)
+    or a 2D array of rows x columns (`key` is an index).
+    """
+    if isinstance(chunk, pd.DataFrame):
+        return chunk[key].to_numpy(dtype = float)
+    return np.asarray(chunk, dtype = float)[:, key]
+
+
+
+def _bin_edges(bins, range):
+    if np.ndim(bins) == 0:
+        if range is None:
+            raise ValueError("chunks are only read once, an amount of bins"
+                " needs their `range`")
+        return np.linspace(range[0], range[1], int(bins) + 1)
+    return np.asarray(bins, dtype = float)
+
+
+
+def bin_chunks(chunks, x, y, bins, range = None, min_count = 2):
+    """
+    Reduces data that comes in chunks (e.g. `read_data(..., chunksize = n)`)
+    to the mean of `y` in bins of `x`, reading every chunk only once, so
+    memory stays bounded by the size of a chunk. Counts, means and
+    variances of every chunk are merged exactly into the running ones.
+
+    Usage example:
+
+    `>>> chunks = read_data('log.csv', chunksize = 10**6)`
+
+    `>>> binned = bin_chunks(chunks, 't', 'V', 200, range = (0, 3600))`
+
+
+    \> Parameters:
+
+    `chunks` : *iterable of DataFrame or 2D array*
+
+    The data, as DataFrames or as arrays of rows x columns.
+
+
+    `x`, `y` : *str or int*
+
+    Column names (or indices, for arrays) of the variables.
+
+
+    `bins` : *int or array-like*
+
+    Edges of the bins, or their amount, equally spaced over `range`.
+    Points outside of the edges (or with a NaN) are left out.
+
+
+    `range` : *(scalar, scalar); optional*
+
+    Lower and upper edges of the bins when `bins` is an int.
+
+    default : `None`
+
+
+    `min_count` : *int; optional*
+
+    Bins with fewer points than this are left out of the result.
+
+    default : `2`
+
+
+    \> Returns:
+
+    A `pandas.DataFrame` with one row per bin and the columns `x` (mean of x
+    in the bin), `y` (mean of y), `yerr` (standard error of the mean of y),
+    `ystd` (standard deviation of y) and `count`.
+
+    """
+
+    edges = _bin_edges(bins, range)
+    nbins = len(edges) - 1
+
+    count = np.zeros(nbins)
+    x_sum = np.zeros(nbins)
+    y_mean = np.zeros(nbins)
+    y_m2 = np.zeros(nbins)
+
+    for chunk in chunks:
+        xs, ys = _column(chunk, x), _column(chunk, y)
+
+        index = np.searchsorted(edges, xs, side = 'right') - 1
+        index[xs == edges[-1]] = nbins - 1 # last bin is closed
+        valid = (index >= 0) & (index < nbins) & np.isfinite(ys)
+        index, xs, ys = index[valid], xs[valid], ys[valid]
+
+        n = np.bincount(index, minlength = nbins).astype(float)
+        filled = n > 0
+        mean = np.divide(np.bincount(index, ys, minlength = nbins), n,
+            out = np.zeros(nbins), where = filled)
+        m2 = np.bincount(index, (ys - mean[index])**2, minlength = nbins)
+
+        # merge the chunk into the running moments (Chan et al.)
+        total = count + n
+        delta = mean - y_mean
+        share = np.divide(n, total, out = np.zeros(nbins), where = total > 0)
+        y_mean += delta * share
+        y_m2 += m2 + delta**2 * count * share
+        x_sum += np.bincount(index, xs, minlength = nbins)
+        count = total
+
+    keep = count >= max(min_count, 1)
+    ystd = np.sqrt(y_m2[keep] / np.maximum(count[keep] - 1, 1))
+
+    return pd.DataFrame(dict(
+        x = x_sum[keep] / count[keep],
+        y = y_mean[keep],
+        yerr = ystd / np.sqrt(count[keep]),
+        ystd = ystd,
+        count = count[keep].astype(int),
+    ))
+
+
+
+def fit_binned(func, chunks, x, y, bins, scope = (globals(), locals()),
+        **options):
+    """
+    Fits data that is too large for memory: it is reduced chunk by chunk to
+    the mean of `y` in bins of `x` (see `bin_chunks`), and the means are fit
+    with their standard errors as `yerr`.
+
+    Usage example:
+
+    `>>> chunks = read_data('log.csv', chunksize = 10**6)`
+
+    `>>> fit_binned('V = {V0}*np.exp(-[t]/{tau})', chunks, 't', 'V', 200,`
+    `...     range = (0, 3600))`
+
+
+    \> Parameters:
+
+    `func` : *string*
+
+    Equation of the curve, with the same format as in `fit`.
+
+
+    `chunks`, `x`, `y`, `bins` :
+
+    Same as in `bin_chunks`.
+
+
+    `scope` : *`(globals(), locals())`; optional*
+
+    Same as in `fit`.
+
+
+    `range`, `min_count` : *optional*
+
+    Same as in `bin_chunks`.
+
+
+    \> Other options:
+
+    Any option of `fit`. `yerr` is taken from the bins.
+
+
+    \> Returns:
+
+    The `FitResult` of the fit, with an additional attribute `bins` holding
+    the binned data.
+
+    """
+
+    kwargs = dict(
+        range = None,
+        min_count = 2,
+    )
+
+    binned_kwargs = {key: options.pop(key, value) \
+        for key, value in kwargs.items()}
+
+    binned = bin_chunks(chunks, x, y, bins, **binned_kwargs)
+    if len(binned) == 0:
+        raise ValueError("no bin has enough points to fit")
+
+    yerr = binned['yerr'].to_numpy()
+    if not np.all(yerr > 0):
+        yerr = None # constant bins would get infinite weights
+
+    result = fit(func, binned['x'].to_numpy(), binned['y'].to_numpy(),
+        scope = scope, yerr = yerr, **options)
+    result.bins = binned
+    return result
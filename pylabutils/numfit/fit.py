@@ -1,5 +1,7 @@
 import re
 import copy
+import time
+import warnings
 
 import numpy as np
 import scipy.optimize as so
@@ -7,14 +9,18 @@ import matplotlib.pyplot as plt
 
 from .methods._odr_fit import _odr_fit
 from .methods._find_beta import _find_beta
+from .methods._fit_result import FitResult, _residual_stats
+from .methods._select_solver import _select_solver
+from .methods._telemetry import _telemetry
 
 from .methods.minimize._sqerr_sum import _sqerr_sum
 
-from ..utils.io._plot_fit import _plot_fit
+from ..utils.io._plot_fit import _plot_fit, _graph_texts
+from ..utils.io._tex_render import _resolve_usetex
 from ..utils.io._print_measure import _print_measure
 
 from .._tools._ffixx import _ffixx
-from .._tools._get_image import _get_image
+from .._tools._compile_func import _compile_func, _find_parms
 
 
 __all__ = ['fit']
@@ -38,7 +44,8 @@ def fit(func, xdata, ydata, scope = (globals(), locals()), **options):
     name, such as 'q', 'theta', etc. 'x' can also have an arbitrary name but
     that name must be either enclosed between square brackets **or** specified
     in the `custom_x` option. If this is the case, avoid using variables
-    named 'x'.
+    named 'x'. Several independent variables can be used by enclosing each
+    one of them between square brackets.
     The function will theoretically have some parameters that will have to
     be found for the data to be fit to the curve. Those parameters must be
     written between curly brackets `{ }`,
@@ -52,7 +59,10 @@ def fit(func, xdata, ydata, scope = (globals(), locals()), **options):
 
     `xdata` : *array-like*
 
-    x-axis data.
+    x-axis data. If the function has several independent variables, as in
+    `'z = {A}*np.exp(-([x]**2 + [y]**2)/{s})'`, a (k, N) array with one row
+    per variable, in order of first appearance in the function. They are all
+    evaluated at once as the rows of a stacked 'x', in every fit method.
 
 
     `y` : *array-like*
@@ -83,10 +93,14 @@ def fit(func, xdata, ydata, scope = (globals(), locals()), **options):
     default : `None`
 
 
-    `fit_method` : *`{'simple', 'odr'}`; optional*
+    `fit_method` : *`{'simple', 'odr', 'auto'}`; optional*
 
     Determines what method is going to be used to fit the parameters to the
-    function. ODR takes `xerr` values into account.
+    function. ODR takes `xerr` values into account. `'auto'` chooses between
+    the two based on how large `xerr` is compared to `yerr` through the slope
+    of the model, and then picks `simple_method` and `jac` as well (based on
+    the amount of points and parameters and on the bounds), unless they are
+    given. The choice and its reasons are stored in the `solver` attribute of the result.
 
     default : `'simple'`
 
@@ -118,11 +132,39 @@ def fit(func, xdata, ydata, scope = (globals(), locals()), **options):
     default : `(-np.inf, np.inf)`
 
 
-    `simple_method` : *{'lm', 'trf', 'dogbox'}; optional*
+    `simple_method` : *{'lm', 'trf', 'dogbox', 'auto'}; optional*
 
     Method to use for optimization when using `fit_method = 'simple'`.
     See (https://docs.scipy.org/doc/scipy/reference/generated/scipy.optimize.curve_fit.html)
-    for more details.
+    for more details. `'auto'` chooses the method as `fit_method = 'auto'`
+    would, without considering ODR.
+
+    default : `None`
+
+
+    `jac` : *callable or {'2-point', '3-point', 'cs'} or None; optional*
+
+    Jacobian passed to `scipy.optimize.curve_fit`. Strings are only valid for
+    the 'trf' and 'dogbox' methods.
+
+    default : `None`
+
+
+    `precision` : *`{'float64', 'float32', 'mixed'}`; optional*
+
+    Precision of the search for `beta0` when it is set to `'find'`. With
+    `'float32'` or `'mixed'` the data is cast to single precision for the
+    differential evolution search, which halves the memory traffic of every
+    model evaluation there. Both are the same: the local fit and the
+    covariance are always computed in double precision.
+
+    default : `'float64'`
+
+
+    `de_chunksize` : *int or None; optional*
+
+    If set, the squared errors of the `beta0` search are computed in chunks
+    of this many points, bounding the size of the temporary arrays.
 
     default : `None`
 
@@ -177,13 +219,25 @@ def fit(func, xdata, ydata, scope = (globals(), locals()), **options):
     default : `['blue', 'red', 'orange']`
 
 
-    `usetex` : *bool; optional*
+    `usetex` : *bool or 'auto'; optional*
 
     Chooses whether to use the TeX engine to render text inside the graphs.
+    With `'auto'`, TeX is only used if some title or label needs it (text
+    mode commands, or math that matplotlib's mathtext cannot parse), which
+    avoids running LaTeX for every string of the graphs.
 
     default : `True`
 
 
+    `tex_cache` : *str or None; optional*
+
+    Directory where the rendered TeX fragments are cached, by a hash of
+    their content. Pointing several processes or machines to the same
+    directory lets them reuse each other's LaTeX runs.
+
+    default : `None` (matplotlib's cache directory)
+
+
     `font_family` : *str; optional*
 
     Specifies which font family the TeX engine will use when rendering text.
@@ -207,6 +261,32 @@ def fit(func, xdata, ydata, scope = (globals(), locals()), **options):
     default : `False`
 
 
+    `downsample` : *`{'lttb', 'minmax'}` or False; optional*
+
+    Method used to reduce the amount of data points that are drawn (not the
+    ones that are fit) when there are more than `downsample_threshold` of
+    them: 'lttb' (largest-triangle-three-buckets) keeps the visual shape of
+    the data, 'minmax' keeps the minimum and the maximum of every bucket.
+    The error bars of every bucket are aggregated (root mean square) into
+    the points kept for it.
+
+    default : `'lttb'`
+
+
+    `downsample_threshold` : *int; optional*
+
+    Amount of data points above which they are downsampled for drawing.
+
+    default : `10000`
+
+
+    `downsample_points` : *int; optional*
+
+    Amount of points drawn after downsampling.
+
+    default : `2000`
+
+
     `linspace_vals` : *scalar; optional*
 
     Specifies the amount of `numpy.linspace` points to be displayed in the
@@ -215,6 +295,62 @@ def fit(func, xdata, ydata, scope = (globals(), locals()), **options):
     default : `400`
 
 
+    `bands` : *False, `{'confidence', 'prediction'}` or list; optional*
+
+    Bands drawn around the curve graph (`fill_between`), computed from the
+    covariance of the parameters (see `FitResult.confidence_band`). A list
+    draws both.
+
+    default : `False`
+
+
+    `band_level` : *float; optional*
+
+    Confidence level of the bands.
+
+    default : `0.95`
+
+
+    `band_alpha` : *float; optional*
+
+    Opacity of the bands.
+
+    default : `0.25`
+
+
+    `sampling` : *`{'linspace', 'adaptive'}`; optional*
+
+    How the points of the curve graph are chosen. 'linspace' evaluates the
+    function at `linspace_vals` evenly spaced points (in the scale of the x
+    axis). 'adaptive' starts from a coarse grid and only refines where the
+    curve deviates from straight segments by more than `sampling_tol`, so
+    smooth curves take few evaluations and sharp peaks are not missed.
+
+    default : `'linspace'`
+
+
+    `sampling_tol` : *float; optional*
+
+    Largest deviation allowed between the adaptive curve and the function,
+    as a fraction of the height of the graph.
+
+    default : `1e-3`
+
+
+    `sampling_max` : *int; optional*
+
+    Largest amount of points of the adaptive curve.
+
+    default : `5000`
+
+
+    `xscale`, `yscale` : *`{'linear', 'log'}`; optional*
+
+    Scales of the axes of the graphs. The curve is sampled in these scales.
+
+    default : `'linear'`
+
+
     `custom_x` : *str; optional*
 
     Specifies which string is to be interpreted as the 'x' variable inside
@@ -242,11 +378,30 @@ def fit(func, xdata, ydata, scope = (globals(), locals()), **options):
     default : '.2uL'` -\> 2 significance digits for uncertainty, LaTeX output
 
 
+    `telemetry` : *bool or 'memory'; optional*
+
+    Chooses whether to record the wall and CPU time and the amount of model
+    evaluations of every stage of the fit (search for `beta0`, solver
+    selection, fit, statistics, printing and graphs) in the `telemetry`
+    attribute of the result. With 'memory', the peak of memory allocated
+    in every stage is also recorded (with `tracemalloc`, which slows the
+    fit down). Telemetries can be added together, e.g.
+    `sum(result.telemetry for result in results)`.
+
+    default : `False`
+
+
     \> Other options:
 
     capsize, titles, labels, markers, linestyles, ecolor, elinewidth,
     errorevery, barsabove, linewitdh, markersize, markevery, fillstyle,
-    jfit_type, jderiv, jvar_calc, jdel_init, jrestart, de_strategy,
+    auto_xerr_ratio (`0.1`, median |dy/dx|*xerr/yerr above which
+    `fit_method = 'auto'` uses ODR), auto_small (`100`, points up to which
+    central differences are used), auto_large (`1e6`, points times
+    parameters above which 'lm' is avoided),
+    jfit_type, jderiv, jvar_calc, jdel_init, jrestart, odr_restart (a
+    previous `scipy.odr.Output`, such as `result.odr_output`, to warm start
+    an ODR fit from), de_strategy,
     de_maxiter, de_popsize, de_tol, de_mutation, de_recombination,
     de_seed, de_callback, de_disp, de_polish, de_init.
 
@@ -264,23 +419,36 @@ def fit(func, xdata, ydata, scope = (globals(), locals()), **options):
 
     `list(zip([fit_parms, fit_parms_us]))`
 
+    The list is a `FitResult`, which also has the attributes `parms`,
+    `values`, `uncertainties`, `solver` (the fit method, simple method
+    and jacobian strategy used, with the reasons when chosen automatically),
+    `odr_output` (the `scipy.odr.Output` of ODR fits, `None` otherwise),
+    `func` (the function string, with 'x' as the independent variable),
+    `fit_func` (the same string with the found values in it),
+    `func_image` (the function compiled with `scope`, as `f(x, *values)`),
+    `yerr` and `absolute_err` (as given),
+    `plot_timings` (for each graph, the seconds spent computing the curve,
+    creating the artists, running TeX and saving, if there are graphs),
+    `cov` (the covariance matrix of the parameters), `dof` and `res_var`
+    (degrees of freedom and residual variance), `chi2` (weighted by `yerr`
+    if given), `status` and `message` (the termination status reported by
+    the solver) and `elapsed` (seconds spent fitting). Its methods
+    `confidence_band(x, level)` and `prediction_band(x, level)` return the
+    lower and upper limits of the bands over any grid `x` (the prediction
+    band spreads by `yerr` if it is absolute). With the
+    `telemetry` option, its `telemetry` attribute holds what every stage
+    of the fit cost.
+
     """
 
-    from .methods.minimize._sqerr_sum import _sqerr_sum
+    start = time.perf_counter()
 
     whole_func = copy.deepcopy(func)
     func = copy.deepcopy(func)[func.find('=')+1:]
 
-    parms = re.findall(r'(?<=\{)\w[\w\.\(\)]*(?=\})', func)
+    parms = _find_parms(func)
     # finds parameters to adjust
 
-    for parm in parms:
-        if parms.count(parm) > 1:
-            temp = parms[::-1]
-            temp.remove(parm)
-            parms = temp[::-1].copy()
-    # removes all duplicates from the end back
-
     kwargs = dict(
         yerr = None,
         xerr = None,
@@ -289,6 +457,8 @@ def fit(func, xdata, ydata, scope = (globals(), locals()), **options):
         bounds = (-np.inf, np.inf),
         fit_method = 'simple',
         simple_method = None,
+        jac = None,
+        precision = 'float64',
         graph = False,
         errorbars = True,
         sizes = [(6, 4), (6, 4), (6, 4)],
@@ -307,22 +477,37 @@ def fit(func, xdata, ydata, scope = (globals(), locals()), **options):
         errorevery = 1,
         barsabove = False,
         linspace_vals = 400,
+        bands = False,
+        band_level = 0.95,
+        band_alpha = 0.25,
+        sampling = 'linspace',
+        sampling_tol = 1e-3,
+        sampling_max = 5000,
+        xscale = 'linear',
+        yscale = 'linear',
         linewidth = 1.5,
         markersize = 6.0,
         markevery = 1,
         fillstyle = 'full',
         usetex = True,
+        tex_cache = None,
         font_family = 'serif',
         custom_x = False,
         printf = False,
         res_fmt = '.2uL',
+        auto_xerr_ratio = 0.1, # solver selection kwargs
+        auto_small = 100,
+        auto_large = 1e6, #
         jfit_type = None, # odr kwargs
         jderiv = None,
         jvar_calc = None,
         jdel_init = None,
-        jrestart = None, #
+        jrestart = None,
+        odr_restart = None, #
+        telemetry = False,
         de_func = _sqerr_sum, #differential_evolution kwargs
         # this ^ kwarg is weird,  I'll have to explain
+        de_chunksize = None,
         de_strategy = 'best1bin',
         de_maxiter = None,
         de_popsize = 15,
@@ -339,6 +524,10 @@ def fit(func, xdata, ydata, scope = (globals(), locals()), **options):
     # defaults = kwargs
     kwargs.update(options) # changes kwargs values to fit kwargs input
 
+    if kwargs['precision'] not in ('float64', 'float32', 'mixed'):
+        raise ValueError(f"{kwargs['precision']!r} is not a valid value for"
+            " `precision`")
+
     # checks if list kwargs are introduced accordingly
     if len([graph == True for graph in (kwargs['graph'] if \
             type(kwargs['graph']) == list else [kwargs['graph']])]) == 1:
@@ -348,7 +537,8 @@ def fit(func, xdata, ydata, scope = (globals(), locals()), **options):
                 kwargs[option] = list(kwargs[option])
 
     # setting rcParams
-    plt.rc('text', usetex = kwargs['usetex'])
+    plt.rc('text', usetex = _resolve_usetex(kwargs['usetex'],
+        _graph_texts(kwargs)))
     plt.rc('font', family = kwargs['font_family'])
 
     # changing custom independent variable to 'x' to work with it later
@@ -357,53 +547,129 @@ def fit(func, xdata, ydata, scope = (globals(), locals()), **options):
     scope[0].update(globals())
     scope[1].update(locals())
 
-    def _func_image(x, *values):
-        return _get_image(x, *values, func_str = func, parms = parms,
-            scope = scope)
-    # nice workaround :-)
+    telemetry = _telemetry(kwargs['telemetry'])
+    _compiled = _compile_func(func, parms, scope = scope)
+    _func_image = telemetry.counted(_compiled)
+    # compiled once, evaluated many times
+
+    user_bounds = kwargs['bounds']
+    # the search bounds for beta0 are not meant to constrain the fit itself
+
+    if type(kwargs['beta0']) == str and kwargs['beta0'] == 'find':
+        # the global search can run in single precision, the local fit
+        # and the covariance below are always computed in double precision
+        search_dtype = np.float32 \
+            if kwargs['precision'] in ('float32', 'mixed') else None
+        search_x = np.asarray(xdata, dtype = search_dtype)
+        search_y = np.asarray(ydata, dtype = search_dtype)
+        chunk_kw = {} if kwargs['de_chunksize'] is None \
+            else dict(chunksize = kwargs['de_chunksize'])
+
+        def _search_image(x, *values):
+            image = _func_image(x, *values)
+            if not checked:
+                checked.append(np.result_type(image))
+                if checked[0] != search_dtype:
+                    warnings.warn(f"the model evaluates in {checked[0]},"
+                        " so the search for beta0 is not in single precision"
+                        " (float64 constants or arrays in the function?)")
+            return image
+        checked = []
 
-    if kwargs['beta0'] == 'find':
         def _de_func(values):
-            return kwargs['de_func'](_func_image,
-                np.array(xdata), np.array(ydata), *values)
+            if search_dtype is not None:
+                # the candidates come as float64, which would promote the data
+                values = np.asarray(values, dtype = search_dtype)
+            return kwargs['de_func'](
+                _func_image if search_dtype is None else _search_image,
+                search_x, search_y, *values, **chunk_kw)
             # !!!!!! the last parameter *values* -- this is VERY confusing
 
-        try:
-            if kwargs['bounds'] == (-np.inf, np.inf):
-                kwargs['bounds'] = (-1e9, 1e9)
-            elif kwargs['bounds'] == None:
-                xy_max = max(max(abs(np.array(xdata))), max(abs(np.array(ydata))))
-                kwargs['bounds'] = (-xy_max, xy_max)
-            kwargs['beta0'] = \
-                _find_beta(_func_image, xdata, ydata, _de_func, len(parms),
+        with telemetry.stage('find_beta'):
+            try:
+                if kwargs['bounds'] == (-np.inf, np.inf):
+                    kwargs['bounds'] = (-1e9, 1e9)
+                elif kwargs['bounds'] == None:
+                    xy_max = max(np.max(np.abs(xdata)), np.max(np.abs(ydata)))
+                    kwargs['bounds'] = (-xy_max, xy_max)
+                kwargs['beta0'] = _find_beta(_func_image,
+                    search_x, search_y, _de_func, len(parms),
                     bounds = kwargs['bounds'])
-                # maybe change the nparms requirement
-        except Exception as e:
-            print(f"Error raised: {e!r}")
-            print("Setting beta0 to [1.] * len(parms)")
-            kwargs['beta0'] = [1.] * len(parms)
-
-
+                    # maybe change the nparms requirement
+            except Exception as e:
+                print(f"Error raised: {e!r}")
+                print("Setting beta0 to [1.] * len(parms)")
+                kwargs['beta0'] = [1.] * len(parms)
+
+    solver = None
+    if kwargs['fit_method'].lower() == 'auto' \
+            or str(kwargs['simple_method']).lower() == 'auto':
+        with telemetry.stage('select_solver'):
+            solver = _select_solver(_func_image, xdata, ydata, len(parms),
+                beta0 = kwargs['beta0'],
+                yerr = kwargs['yerr'],
+                xerr = kwargs['xerr'],
+                bounds = user_bounds,
+                fit_method = kwargs['fit_method'].lower(),
+                simple_method = kwargs['simple_method'],
+                jac = kwargs['jac'],
+                jderiv = kwargs['jderiv'],
+                auto_xerr_ratio = kwargs['auto_xerr_ratio'],
+                auto_small = kwargs['auto_small'],
+                auto_large = kwargs['auto_large'],
+                )
+        # the solver keeps what was given, only what was left on auto is
+        # filled in
+        kwargs['fit_method'] = solver['fit_method']
+        kwargs['simple_method'] = solver['simple_method']
+        kwargs['jac'] = solver['jac']
+        if solver['jderiv'] is not None:
+            kwargs['jderiv'] = solver['jderiv']
+
+    # whatever the solver, the fit only has the bounds the user gave
+    kwargs['bounds'] = user_bounds if user_bounds is not None \
+        else (-np.inf, np.inf)
+
+    odr_output = None
     if kwargs['fit_method'].lower() == 'simple':
         # simple method
-        sols = so.curve_fit(
-            _func_image, xdata, ydata,
-            p0 = kwargs['beta0'],
-            sigma = kwargs['yerr'],
-            absolute_sigma = kwargs['absolute_err'],
-            bounds = kwargs['bounds'],
-            method = kwargs['simple_method']
-            )
+        with telemetry.stage('fit'):
+            sols = so.curve_fit(
+                _func_image, xdata, ydata,
+                p0 = kwargs['beta0'],
+                sigma = kwargs['yerr'],
+                absolute_sigma = kwargs['absolute_err'],
+                bounds = kwargs['bounds'],
+                method = kwargs['simple_method'],
+                jac = kwargs['jac'],
+                full_output = True,
+                )
 
         fit_parms = sols[0]
         fit_parms_us = np.sqrt(np.diag(sols[1]))
+        fit_cov = sols[1]
+        status, message = int(sols[4]), sols[3]
 
 
     elif kwargs['fit_method'].lower() == 'odr':
 
-        fit_parms, fit_parms_us = \
-            _odr_fit(_func_image, xdata, ydata, **kwargs)
+        with telemetry.stage('fit'):
+            fit_parms, fit_parms_us, odr_output = _odr_fit(_func_image,
+                xdata, ydata, full_output = True, **kwargs)
+        fit_cov = odr_output.cov_beta * odr_output.res_var
+        # sd_beta is computed the same way
+        status = int(odr_output.info)
+        message = '; '.join(odr_output.stopreason)
+
 
+    if solver is None:
+        solver = dict(
+            fit_method = kwargs['fit_method'].lower(),
+            simple_method = kwargs['simple_method'],
+            jac = kwargs['jac'],
+            jderiv = kwargs['jderiv'],
+            reasons = [],
+        )
 
     # results
 
@@ -415,15 +681,12 @@ def fit(func, xdata, ydata, scope = (globals(), locals()), **options):
     # fit_parms = [us.ufloat(parm, u) \
     #    for parm, u in zip(fit_parm, fit_parms_us)]
 
-    fit_func = copy.deepcopy(func)
-    for i in range(len(fit_parms)):
-        fit_func = re.sub( \
-            f'{{{parms[i]}}}', str(fit_parms[i]), fit_func)
-
 
     # new: introducing uncertainties module as requirement (formatting only)
-    for name, pair in zip(parms, zip(fit_parms, fit_parms_us)):
-        _print_measure(pair[0], pair[1], name = name, fmt = kwargs['res_fmt'])
+    with telemetry.stage('print'):
+        for name, pair in zip(parms, zip(fit_parms, fit_parms_us)):
+            _print_measure(pair[0], pair[1], name = name,
+                fmt = kwargs['res_fmt'])
 
     # graph section
     # one graph has the data and the image points through the fit function
@@ -434,9 +697,26 @@ def fit(func, xdata, ydata, scope = (globals(), locals()), **options):
     scope[0].update(globals())
     scope[1].update(locals())
 
+    with telemetry.stage('stats'):
+        dof, res_var, chi2 = _residual_stats(_func_image, xdata, ydata,
+            fit_parms, yerr = kwargs['yerr'])
+    telemetry.terminated(message)
+    result = FitResult(parms, fit_parms, fit_parms_us, solver = solver,
+        odr_output = odr_output, func = func, cov = fit_cov, dof = dof,
+        res_var = res_var, chi2 = chi2, status = status, message = message,
+        elapsed = time.perf_counter() - start,
+        telemetry = telemetry if kwargs['telemetry'] else None,
+        func_image = _compiled, yerr = kwargs['yerr'],
+        absolute_err = kwargs['absolute_err'])
+
+    fit_func = result.fit_func
+    # the values between parentheses, negative ones keep their sign
+
     if kwargs['graph'] != False and any(kwargs['graph']):
-        _plot_fit(xdata, ydata, func_str = fit_func, scope = scope,
-            **kwargs)
+        with telemetry.stage('plot'):
+            result.plot_timings = _plot_fit(xdata, ydata,
+                func_str = fit_func, fit_result = result, scope = scope,
+                **kwargs)
 
     # print the function?
     if kwargs['printf']:
@@ -448,5 +728,5 @@ def fit(func, xdata, ydata, scope = (globals(), locals()), **options):
         # possibility to print function with parameter uncertainties?
     # improvements could be made in all the function string naming and that...
     # returns [(parm, parm_unc), ...]
-    return list(zip([fit_parms, fit_parms_us]))
+    return result
 
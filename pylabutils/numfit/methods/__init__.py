@@ -8,6 +8,12 @@ from ._find_beta import _find_beta
 
 from ._odr_fit import _odr_fit
 
+from ._fit_result import FitResult
+
+from ._select_solver import _select_solver
+
+from ._peak_seeds import _peak_seeds, _peak_func, _peak_jac
+
 from . import minimize
 from .minimize import *
 
@@ -29,8 +29,9 @@ def _find_beta(func, xdata, ydata, min_func, nparms, **options):
 
     if kw['fb_method'].lower() == 'differential_evolution':
         try:
-            x_max, y_max = max(xdata), max(ydata)
-            x_min, y_min = min(xdata), min(ydata)
+            x_max, y_max = np.max(xdata), np.max(ydata)
+            x_min, y_min = np.min(xdata), np.min(ydata)
+            # np.max/np.min also work with several stacked x variables
             xy_max, xy_min = max(x_max, y_max), min(x_min, y_min)
             if kw['bounds'] == None or kw['bounds'] == (-np.inf, np.inf):
                 kw['bounds'] = [
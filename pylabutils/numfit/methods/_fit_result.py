@@ -0,0 +1,172 @@
+import numpy as np
+import scipy.stats as sst
+
+from ..._tools._compile_func import _compile_func
+
+__all__ = ['FitResult', '_residual_stats']
+
+
+
+def _residual_stats(_func_image, xdata, ydata, values, yerr = None):
+    """
+    Degrees of freedom, residual variance (sum of the squared residuals
+    over the degrees of freedom) and chi squared (the sum of the squared
+    residuals over `yerr`, or unweighted without it) of a fit.
+    """
+    ydata = np.asarray(ydata, dtype = float)
+    dof = ydata.shape[-1] - len(values)
+    residuals = ydata - _func_image(np.asarray(xdata, dtype = float), *values)
+    sqsum = float(np.sum(residuals**2))
+    res_var = sqsum / dof if dof > 0 else np.nan
+    chi2 = sqsum if yerr is None \
+        else float(np.sum((residuals / np.asarray(yerr, dtype = float))**2))
+    return dof, res_var, chi2
+
+
+
+class FitResult(list):
+    """
+    Result of a `fit` call. It is the same
+    `list(zip([fit_parms, fit_parms_us]))` that `fit` has always returned,
+    so it can be indexed and unpacked as before, but it also keeps some
+    information about the fit as attributes.
+    """
+
+    def __init__(self, parms, values, uncertainties, solver = None,
+            odr_output = None, func = None, plot_timings = None, cov = None,
+            dof = None, res_var = None, chi2 = None, status = None,
+            message = None, elapsed = None, telemetry = None,
+            func_image = None, yerr = None, absolute_err = True):
+        super().__init__(zip([values, uncertainties]))
+
+        self.parms = list(parms)
+        self.values = np.asarray(values)
+        self.uncertainties = np.asarray(uncertainties)
+        # solver actually used, and why (when it was chosen automatically)
+        self.solver = solver
+        # scipy.odr.Output of ODR fits, usable to warm start another fit
+        self.odr_output = odr_output
+        # fit function string, with the parameters between curly brackets
+        self.func = func
+        # the same function compiled with the scope of the fit, f(x, *values)
+        self.func_image = func_image
+        # time spent in each stage of drawing every graph
+        self.plot_timings = plot_timings
+        # covariance matrix of the parameters, degrees of freedom and
+        # residual variance, for the confidence and prediction bands
+        self.cov = None if cov is None else np.asarray(cov, dtype = float)
+        self.dof = dof
+        self.res_var = res_var
+        self.chi2 = chi2
+        # uncertainties of the measurements, for the prediction band
+        self.yerr = yerr
+        self.absolute_err = absolute_err
+        # termination status and message as reported by the solver
+        # (curve_fit's ier and mesg, or ODR's info and stopreason)
+        self.status = status
+        self.message = message
+        # seconds spent in the fit itself (graphs not included)
+        self.elapsed = elapsed
+        # Telemetry of every stage of the fit, if it was asked for
+        self.telemetry = telemetry
+
+
+    def __getstate__(self):
+        # compiled functions can't be pickled (as results of pool workers
+        # are), the bands compile `func` again without it
+        state = dict(self.__dict__)
+        state['func_image'] = None
+        return state
+
+
+    @property
+    def fit_func(self):
+        """
+        The fit function string with the found values in place of the
+        parameters, each between parentheses so that negative ones keep
+        their sign under powers (`{A}**2`).
+        """
+        if self.func is None:
+            return None
+
+        fit_func = self.func
+        for parm, value in zip(self.parms, self.values):
+            fit_func = fit_func.replace(f'{{{parm}}}', f'({float(value)!r})')
+        return fit_func
+
+
+    def _curve_variance(self, x):
+        """
+        Value of the fit function over `x` and its variance propagated from
+        the covariance of the parameters (delta method). The Jacobian over
+        the whole grid comes from a single evaluation, with every central
+        difference step of the parameters broadcast along a new axis.
+        """
+        if self.func is None or self.cov is None:
+            raise ValueError("the fit function and the covariance matrix are"
+                " needed for the bands")
+
+        _func_image = self.func_image if self.func_image is not None \
+            else _compile_func(self.func, self.parms)
+        x = np.asarray(x, dtype = float)
+        values = self.values.astype(float)
+        nparms = len(values)
+
+        y = np.broadcast_to(_func_image(x, *values), x.shape[-1:])
+
+        steps = np.finfo(float).eps**(1/3) * np.maximum(np.abs(values), 1.)
+        shifts = np.concatenate([np.diag(steps), -np.diag(steps)])
+        # P parameters, each a 2P x 1 column of its shifted values
+        betas = (values + shifts).T[..., None]
+        try:
+            images = np.broadcast_to(_func_image(x[..., None, :], *betas),
+                (2 * nparms, x.shape[-1]))
+        except Exception:
+            # the function does not broadcast, so one call per step
+            images = np.array([np.broadcast_to(_func_image(x, *beta),
+                x.shape[-1:]) for beta in values + shifts])
+        jac = (images[:nparms] - images[nparms:]) / (2 * steps[:, None])
+
+        var = np.einsum('in,ij,jn->n', jac, self.cov, jac)
+        return y, var
+
+
+    def _quantile(self, level):
+        """
+        Two-sided quantile for a confidence `level`, from the Student's t
+        distribution (the normal one when there are no degrees of freedom).
+        """
+        if self.dof is not None and self.dof > 0:
+            return sst.t.ppf((1 + level) / 2, self.dof)
+        return sst.norm.ppf((1 + level) / 2)
+
+
+    def confidence_band(self, x, level = 0.95):
+        """
+        Lower and upper limits of the confidence band of the fit curve over
+        the grid `x`, for a confidence `level`.
+        """
+        y, var = self._curve_variance(x)
+        half = self._quantile(level) * np.sqrt(var)
+        return y - half, y + half
+
+
+    def prediction_band(self, x, level = 0.95):
+        """
+        Lower and upper limits of the prediction band (where a new
+        measurement is expected) over the grid `x`, for a confidence
+        `level`. The spread of new measurements is the variance of the
+        measurements when the fit had absolute `yerr` (point by point if `x`
+        are the measured points, their mean square otherwise), and the
+        residual variance of the fit if not.
+        """
+        y, var = self._curve_variance(x)
+        if self.yerr is not None and self.absolute_err:
+            meas_var = np.asarray(self.yerr, dtype = float)**2
+            if meas_var.ndim and meas_var.shape[-1:] != y.shape[-1:]:
+                meas_var = np.mean(meas_var)
+        else:
+            meas_var = self.res_var if self.res_var is not None \
+                and np.isfinite(self.res_var) else 0.
+        half = self._quantile(level) * np.sqrt(var + meas_var)
+        return y - half, y + half
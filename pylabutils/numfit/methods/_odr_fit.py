@@ -1,8 +1,33 @@
+import time
+
+import numpy as np
 import scipy.odr as sodr
 
+__all__ = ['_odr_fit', '_odr_batch', '_odr_model']
+
+
+
+def _odr_model(_func_image):
+    """
+    Builds a scipy.odr.Model from a _func_image format callable (such as the
+    one returned by `_compile_func`), which is evaluated once over the whole
+    x array per call. The same model can be reused for any amount of fits.
+    """
+    def _mod_func(parms, x):
+        return _func_image(x, *parms)
+    # model takes arguments swapped...
+
+    return sodr.Model(_mod_func)
+
+
+
 def _odr_fit(_func_image, xdata, ydata, **options):
     """
     Computes an ODR fit using scipy.ODR.ODR based on a _func_image format.
+    `_func_image` can also be an already built scipy.odr.Model.
+    Passing a previous scipy.odr.Output as `odr_restart` warm starts the fit
+    from its parameters (and from its x offsets, if the data has the same
+    shape); with `jrestart = 1` ODRPACK continues the previous run instead.
     """
 
     kw = dict(
@@ -14,19 +39,31 @@ def _odr_fit(_func_image, xdata, ydata, **options):
         jvar_calc = None,
         jdel_init = None,
         jrestart = None,
+        odr_restart = None,
+        full_output = False,
     )
 
     kw.update(options)
 
     data = sodr.RealData(xdata, ydata, sx = kw['xerr'], sy = kw['yerr'])
 
-    def _mod_func(parms, x):
-        return _func_image(x, *parms)
-    # model takes arguments swapped...
+    model = _func_image if isinstance(_func_image, sodr.Model) \
+        else _odr_model(_func_image)
 
-    model = sodr.Model(_mod_func)
+    previous = kw['odr_restart']
+    beta0, delta0, work, iwork = kw['beta0'], None, None, None
+    if previous is not None:
+        beta0 = previous.beta
+        delta = getattr(previous, 'delta', None)
+        if delta is not None and np.shape(delta) == np.shape(data.x):
+            delta0 = delta
+            if kw['jdel_init'] is None:
+                kw['jdel_init'] = 1
+        if kw['jrestart'] == 1:
+            work, iwork = previous.work, previous.iwork
 
-    odr = sodr.ODR(data, model, beta0 = kw['beta0'])
+    odr = sodr.ODR(data, model, beta0 = beta0, delta0 = delta0,
+        work = work, iwork = iwork)
     odr.set_job(
         fit_type = kw['jfit_type'],
         deriv = kw['jderiv'],
@@ -37,4 +74,48 @@ def _odr_fit(_func_image, xdata, ydata, **options):
 
     output = odr.run()
 
-    return output.beta, output.sd_beta
\ No newline at end of file
+    if kw['full_output']:
+        return output.beta, output.sd_beta, output
+    return output.beta, output.sd_beta
+
+
+
+def _odr_batch(_func_image, datasets, **options):
+    """
+    Computes ODR fits for several datasets sharing the same model, built only
+    once. `datasets` is a list of dicts with the keys `xdata`, `ydata` and
+    optionally `xerr` and `yerr`. If `warm_start`, each fit starts from the
+    output of the previous one. Returns the list of scipy.odr.Output, each
+    with an additional `elapsed` attribute (seconds spent in the fit).
+    """
+
+    kw = dict(
+        beta0 = None,
+        warm_start = True,
+    )
+
+    kw.update(options)
+    warm_start = kw.pop('warm_start')
+    kw.pop('full_output', None)
+
+    model = _func_image if isinstance(_func_image, sodr.Model) \
+        else _odr_model(_func_image)
+
+    outputs = []
+    previous = kw.pop('odr_restart', None)
+    for dataset in datasets:
+        kw.update(
+            xerr = dataset.get('xerr'),
+            yerr = dataset.get('yerr'),
+            odr_restart = previous,
+            full_output = True,
+            )
+        start = time.perf_counter()
+        output = _odr_fit(model, dataset['xdata'], dataset['ydata'], **kw)[2]
+        output.elapsed = time.perf_counter() - start
+        outputs.append(output)
+
+        if warm_start:
+            previous = output
+
+    return outputs
@@ -0,0 +1,140 @@
+import numpy as np
+import scipy.signal as ss
+
+__all__ = ['_peak_seeds', '_peak_func', '_peak_jac']
+
+
+_FWHM_PER_WIDTH = dict(
+    gaussian = 2. * np.sqrt(2. * np.log(2.)), # fwhm = 2.355 sigma
+    lorentzian = 2., # fwhm = 2 gamma
+)
+
+
+
+def _peak_seeds(xdata, ydata, **options):
+    """
+    Detects peaks in (sorted) data and estimates the centre, width and
+    amplitude of each one from the data around it, together with bounds
+    that keep every component inside a window around its peak.
+    Returns `(seeds, lower, upper)`, each with 3 values per peak (plus the
+    baseline, if any) in the order of `_peak_func`.
+    """
+
+    kw = dict(
+        npeaks = None,
+        shape = 'gaussian',
+        prominence = None,
+        width = 2,
+        window = 2.,
+        baseline = True,
+    )
+
+    kw.update(options)
+
+    xdata = np.asarray(xdata, dtype = float)
+    ydata = np.asarray(ydata, dtype = float)
+
+    yrange = np.ptp(ydata)
+    base = float(np.min(ydata)) if kw['baseline'] else 0.
+    if kw['prominence'] is not None:
+        prominence = kw['prominence']
+    else:
+        # noise from the MAD of the differences, which the peaks barely
+        # change, so that noise bumps are not taken as peaks
+        steps = np.diff(ydata)
+        noise = 1.4826 * np.median(np.abs(steps - np.median(steps))) \
+            / np.sqrt(2.) if len(steps) else 0.
+        prominence = max(0.05 * yrange, 8. * noise)
+
+    peaks, props = ss.find_peaks(ydata, prominence = prominence,
+        width = kw['width'])
+    if len(peaks) == 0:
+        raise ValueError("no peaks found in the data")
+
+    # strongest peaks first, kept in order of position afterwards
+    order = np.argsort(props['prominences'])[::-1]
+    if kw['npeaks'] is not None:
+        order = order[:kw['npeaks']]
+    peaks = np.sort(peaks[order])
+
+    widths, _, left, right = ss.peak_widths(ydata, peaks, rel_height = 0.5)
+    index = np.arange(len(xdata))
+    fwhm = np.interp(right, index, xdata) - np.interp(left, index, xdata)
+    fwhm = np.maximum(fwhm, np.min(np.diff(xdata)) if len(xdata) > 1 else 1.)
+
+    centres = xdata[peaks]
+    amplitudes = np.maximum(ydata[peaks] - base, np.finfo(float).tiny)
+    widths = fwhm / _FWHM_PER_WIDTH[kw['shape']]
+
+    seeds = np.column_stack([amplitudes, centres, widths]).ravel()
+    lower = np.column_stack([
+        np.zeros(len(peaks)),
+        centres - kw['window'] * fwhm,
+        widths / 5.,
+        ]).ravel()
+    upper = np.column_stack([
+        2. * np.maximum(amplitudes, yrange),
+        centres + kw['window'] * fwhm,
+        widths * 5.,
+        ]).ravel()
+
+    if kw['baseline']:
+        seeds = np.append(seeds, base)
+        lower = np.append(lower, base - yrange)
+        upper = np.append(upper, float(np.max(ydata)))
+
+    return seeds, lower, upper
+
+
+
+def _peak_func(npeaks, shape = 'gaussian', baseline = True):
+    """
+    Builds the string function (in the format of `fit`) of a sum of `npeaks`
+    gaussian or lorentzian components, with parameters A_i, mu_i and s_i
+    (or x0_i and g_i), and an optional constant baseline `c`.
+    """
+    if shape == 'gaussian':
+        term = '{{A_{0}}}*np.exp(-(x-{{mu_{0}}})**2/(2*{{s_{0}}}**2))'
+    elif shape == 'lorentzian':
+        term = '{{A_{0}}}/(1+((x-{{x0_{0}}})/{{g_{0}}})**2)'
+    else:
+        raise ValueError(f"{shape!r} is not a valid value for `shape`")
+
+    func = 'y = ' + ' + '.join(term.format(i) for i in range(npeaks))
+    if baseline:
+        func += ' + {c}'
+    return func
+
+
+
+def _peak_jac(npeaks, shape = 'gaussian', baseline = True):
+    """
+    Returns the analytic jacobian, in the format used by
+    `scipy.optimize.curve_fit`, of the function built by `_peak_func`.
+    All the components are evaluated at once, so each call costs about as
+    much as one evaluation of the function.
+    """
+    def _jac(x, *values):
+        x = np.asarray(x, dtype = float)
+        p = np.asarray(values[:3*npeaks], dtype = float).reshape(npeaks, 3)
+        amp, centre, width = (p[:, i, np.newaxis] for i in range(3))
+        u = (x - centre) / width
+
+        if shape == 'gaussian':
+            g = np.exp(-u**2 / 2.)
+            d_amp = g
+            d_centre = amp * g * u / width
+            d_width = amp * g * u**2 / width
+        else:
+            l = 1. / (1. + u**2)
+            d_amp = l
+            d_centre = 2. * amp * u * l**2 / width
+            d_width = 2. * amp * u**2 * l**2 / width
+
+        jac = np.stack([d_amp, d_centre, d_width], axis = 1) \
+            .reshape(3*npeaks, -1).T
+        if baseline:
+            jac = np.column_stack([jac, np.ones(x.shape[-1])])
+        return jac
+
+    return _jac
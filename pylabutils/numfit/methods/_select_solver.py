@@ -0,0 +1,131 @@
+import numpy as np
+
+__all__ = ['_select_solver']
+
+def _select_solver(_func_image, xdata, ydata, nparms, **options):
+    """
+    Picks the fit method, least squares method and jacobian strategy for a
+    problem, based on its size, its bounds and on how much `xerr` matters
+    compared to `yerr` through the slope of the model.
+    Returns a dict with the choices and the reasons behind them.
+    """
+
+    kw = dict(
+        beta0 = None,
+        yerr = None,
+        xerr = None,
+        bounds = (-np.inf, np.inf),
+        fit_method = 'auto', # 'simple' or 'odr' keep the method given
+        simple_method = 'auto', # same for the least squares method
+        jac = None, # and for the jacobian
+        jderiv = None, # and for the ODR derivatives
+        auto_xerr_ratio = 0.1,
+        auto_small = 100,
+        auto_large = 1e6,
+    )
+
+    kw.update(options)
+
+    xdata = np.asarray(xdata, dtype = float)
+    ydata = np.asarray(ydata, dtype = float)
+    npoints = ydata.size
+    beta0 = kw['beta0'] if kw['beta0'] is not None else [1.] * nparms
+
+    reasons = []
+    solver = dict(
+        fit_method = 'odr' if kw['fit_method'] == 'odr' else 'simple',
+        simple_method = None,
+        jac = None,
+        jderiv = None,
+        reasons = reasons,
+    )
+
+    # does xerr matter? compare |f'(x)|*xerr against yerr (or the residuals)
+    if kw['fit_method'] == 'auto' and kw['xerr'] is not None:
+        xerr = np.abs(np.asarray(kw['xerr'], dtype = float))
+        h = 1e-6 * np.maximum(np.abs(xdata), 1.)
+        try:
+            if xdata.ndim > 1:
+                # several variables: |grad f . xerr| added in quadrature
+                xerr = xerr * np.ones(xdata.shape)
+                effect = np.zeros(npoints)
+                for i in range(xdata.shape[0]):
+                    step = np.zeros(xdata.shape)
+                    step[i] = h[i]
+                    effect += ((_func_image(xdata + step, *beta0) \
+                        - _func_image(xdata - step, *beta0)) \
+                        / (2. * h[i]) * xerr[i]) ** 2
+                slope, xerr = np.sqrt(effect), 1.
+            else:
+                slope = (_func_image(xdata + h, *beta0) \
+                    - _func_image(xdata - h, *beta0)) / (2. * h)
+            if kw['yerr'] is not None:
+                yscale = np.abs(np.asarray(kw['yerr'], dtype = float))
+            else:
+                yscale = np.std(ydata - _func_image(xdata, *beta0)) \
+                    * np.ones(npoints)
+            yscale = np.where(yscale > 0, yscale, np.finfo(float).tiny)
+            ratio = float(np.median(np.abs(slope) * xerr / yscale))
+        except Exception as e:
+            ratio = np.inf
+            reasons.append(f"could not estimate the model slope ({e!r}),"
+                " assuming xerr matters")
+
+        if not ratio <= kw['auto_xerr_ratio']: # nan counts as significant
+            solver['fit_method'] = 'odr'
+            reasons.append(f"|dy/dx|*xerr/yerr ~ {ratio:.3g} >"
+                f" {kw['auto_xerr_ratio']}: xerr is significant, using ODR")
+        else:
+            reasons.append(f"|dy/dx|*xerr/yerr ~ {ratio:.3g} <="
+                f" {kw['auto_xerr_ratio']}: xerr is negligible")
+
+    elif kw['fit_method'] == 'auto':
+        reasons.append("no xerr given")
+    else:
+        reasons.append(f"fit_method = {kw['fit_method']!r} given")
+
+    if solver['fit_method'] == 'odr' and kw['jderiv'] is not None:
+        solver['jderiv'] = kw['jderiv']
+        reasons.append(f"jderiv = {kw['jderiv']!r} given")
+        return solver
+    elif solver['fit_method'] == 'odr':
+        # central differences are only worth it for small problems
+        solver['jderiv'] = 1 if npoints <= kw['auto_small'] else 0
+        reasons.append("{} finite differences for {} points".format(
+            'central' if solver['jderiv'] else 'forward', npoints))
+        return solver
+
+    lower, upper = kw['bounds'] if kw['bounds'] is not None \
+        else (-np.inf, np.inf)
+    bounded = bool(np.any(np.isfinite(lower)) or np.any(np.isfinite(upper)))
+
+    if str(kw['simple_method']).lower() not in ('auto', 'none'):
+        solver['simple_method'] = kw['simple_method']
+        reasons.append(f"simple_method = {kw['simple_method']!r} given")
+    elif bounded:
+        solver['simple_method'] = 'trf'
+        reasons.append("finite bounds, which 'lm' does not support: 'trf'")
+    elif npoints < nparms:
+        solver['simple_method'] = 'trf'
+        reasons.append(f"fewer points ({npoints}) than parameters ({nparms}),"
+            " which 'lm' does not support: 'trf'")
+    elif npoints * nparms > kw['auto_large']:
+        solver['simple_method'] = 'trf'
+        reasons.append(f"large problem ({npoints} x {nparms} jacobian): 'trf'")
+    else:
+        solver['simple_method'] = 'lm'
+        reasons.append("unbounded problem of moderate size: 'lm'")
+
+    if kw['jac'] is not None:
+        solver['jac'] = kw['jac']
+        reasons.append(f"jac = {kw['jac']!r} given")
+    elif solver['simple_method'] == 'lm':
+        reasons.append("MINPACK forward differences for the jacobian")
+    elif npoints <= kw['auto_small']:
+        solver['jac'] = '3-point'
+        reasons.append(f"'3-point' jacobian, cheap for {npoints} points")
+    else:
+        solver['jac'] = '2-point'
+        reasons.append(f"'2-point' jacobian for {npoints} points")
+
+    return solver
@@ -0,0 +1,105 @@
+from collections import namedtuple
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+__all__ = ['_SharedArray', '_share_arrays', '_attach_arrays']
+
+
+
+_SharedArray = namedtuple('_SharedArray', ['name', 'offset', 'shape', 'dtype'])
+# picklable description of an array stored in a shared memory block
+
+
+
+def _collect(obj, arrays):
+    # nested dicts, lists and tuples, every numpy array is collected
+    if isinstance(obj, np.ndarray):
+        arrays.append(obj)
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            _collect(value, arrays)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            _collect(value, arrays)
+
+
+
+def _replace(obj, func):
+    if isinstance(obj, (np.ndarray, _SharedArray)):
+        return func(obj)
+    elif isinstance(obj, dict):
+        return {key: _replace(value, func) for key, value in obj.items()}
+    elif isinstance(obj, (list, tuple)):
+        return type(obj)(_replace(value, func) for value in obj)
+    return obj
+
+
+
+@contextmanager
+def _share_arrays(obj, align = 64):
+    """
+    Copies every numpy array inside `obj` (nested dicts, lists and tuples)
+    into a single shared memory block, once, and yields `obj` with the
+    arrays replaced by `_SharedArray` descriptors, which are cheap to send
+    to worker processes. The block is released and unlinked on exit, also
+    when an error is raised.
+    """
+    arrays = []
+    _collect(obj, arrays)
+
+    offsets, size = {}, 0
+    for array in arrays:
+        if id(array) in offsets:
+            continue
+        offsets[id(array)] = size
+        size += -(-array.nbytes // align) * align
+
+    block = shared_memory.SharedMemory(create = True, size = max(size, 1))
+    try:
+        for array in arrays:
+            view = np.ndarray(array.shape, dtype = array.dtype,
+                buffer = block.buf, offset = offsets[id(array)])
+            view[...] = array
+            del view
+
+        yield _replace(obj, lambda array: _SharedArray(block.name,
+            offsets[id(array)], tuple(array.shape), array.dtype.str))
+
+    finally:
+        block.close()
+        block.unlink()
+
+
+
+@contextmanager
+def _attach_arrays(obj):
+    """
+    Yields `obj` with every `_SharedArray` descriptor replaced by a read
+    only numpy view of the shared memory block (no copies). The block is
+    unmapped on exit, and numpy does not keep it from being unmapped, so
+    nothing taken from the views (slices of them or results that store
+    them) may escape the `with` block: whatever is returned from inside
+    it has to be copied first, reading a view afterwards crashes.
+    """
+    blocks = {}
+
+    def _view(descriptor):
+        if isinstance(descriptor, np.ndarray):
+            return descriptor
+        name, offset, shape, dtype = descriptor
+        if name not in blocks:
+            blocks[name] = shared_memory.SharedMemory(name = name)
+            # the pool workers share the resource tracker of the process
+            # that created the block, which is the one that unlinks it
+        view = np.ndarray(shape, dtype = dtype, buffer = blocks[name].buf,
+            offset = offset)
+        view.flags.writeable = False
+        return view
+
+    try:
+        yield _replace(obj, _view)
+    finally:
+        for block in blocks.values():
+            block.close()
@@ -0,0 +1,168 @@
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+import pandas as pd
+
+__all__ = ['Telemetry', '_telemetry']
+
+
+
+class Telemetry(dict):
+    """
+    What a fit spent in each of its stages ('find_beta', 'select_solver',
+    'fit', 'stats', 'print', 'plot'): a dict from the stage name to a dict with the wall
+    and CPU seconds (`wall`, `cpu`), the number of evaluations of the model
+    (`evals`) and, if memory tracing was asked for, the peak of memory
+    allocated during the stage in bytes (`peak`; before Python 3.9 it can
+    not be reset, so it is the peak since tracing started). The solver's
+    termination message is counted in `terminations`.
+
+    Telemetries add up, so `sum(result.telemetry for result in results)`
+    aggregates a whole batch (peaks are the maximum instead).
+    """
+
+    def __init__(self, memory = False):
+        super().__init__()
+        self.memory = memory
+        self.fits = 1
+        self.terminations = Counter()
+        self._current = []
+        self._peaks = [] # the peak so far of every open stage
+
+
+    def _entry(self, name):
+        return self.setdefault(name,
+            dict(wall = 0., cpu = 0., evals = 0, peak = None))
+
+
+    @contextmanager
+    def stage(self, name):
+        entry = self._entry(name)
+        self._current.append(entry)
+
+        # tracing only runs inside the stages, and is always stopped below
+        started = self.memory and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        if self.memory:
+            base, peak = tracemalloc.get_traced_memory()
+            if self._peaks:
+                # the peak of the enclosing stage is kept before the reset
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            if hasattr(tracemalloc, 'reset_peak'): # python >= 3.9
+                tracemalloc.reset_peak()
+            self._peaks.append(0)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            entry['wall'] += time.perf_counter() - wall
+            entry['cpu'] += time.process_time() - cpu
+            if self.memory:
+                peak = max(tracemalloc.get_traced_memory()[1],
+                    self._peaks.pop())
+                entry['peak'] = max(entry['peak'] or 0, peak - base)
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+            if started:
+                tracemalloc.stop()
+            self._current.pop()
+
+
+    def counted(self, _func_image):
+        """
+        Wraps a model function so that every call is counted in the stage
+        that is running.
+        """
+        return _Counted(_func_image, self)
+
+
+    def terminated(self, message):
+        if message:
+            self.terminations[str(message).strip()] += 1
+
+
+    def __add__(self, other):
+        if other == 0: # so that sum() works
+            return self
+        if not isinstance(other, Telemetry):
+            return NotImplemented
+
+        total = Telemetry(memory = self.memory or other.memory)
+        for telemetry in [self, other]:
+            for name, entry in telemetry.items():
+                summed = total._entry(name)
+                for key in ['wall', 'cpu', 'evals']:
+                    summed[key] += entry[key]
+                if entry['peak'] is not None:
+                    summed['peak'] = max(summed['peak'] or 0, entry['peak'])
+        total.fits = self.fits + other.fits
+        total.terminations = self.terminations + other.terminations
+        return total
+
+
+    __radd__ = __add__
+
+
+    def __getstate__(self):
+        return dict(memory = self.memory, fits = self.fits,
+            terminations = self.terminations, _current = [], _peaks = [])
+
+
+    def table(self):
+        """
+        The telemetry as a `pandas.DataFrame` with one row per stage.
+        """
+        return pd.DataFrame.from_dict(dict(self), orient = 'index')
+
+
+
+class _Counted:
+    """
+    Model function that counts its calls in the running stage of its
+    `telemetry`, which can be swapped between fits that share the function.
+    """
+
+    def __init__(self, _func_image, telemetry):
+        self._func_image = _func_image
+        self.telemetry = telemetry
+        for attr in ['func_str', 'parms']:
+            if hasattr(_func_image, attr):
+                setattr(self, attr, getattr(_func_image, attr))
+
+    def __call__(self, *args, **kwargs):
+        current = self.telemetry._current
+        if current:
+            current[-1]['evals'] += 1
+        return self._func_image(*args, **kwargs)
+
+
+
+class _NoTelemetry:
+    """
+    Stand-in used when telemetry is off, so that recording costs nothing.
+    """
+    _context = nullcontext()
+
+    def stage(self, name):
+        return self._context
+
+    def counted(self, _func_image):
+        return _func_image
+
+    def terminated(self, message):
+        pass
+
+
+
+def _telemetry(option):
+    """
+    The `Telemetry` of a fit according to the `telemetry` option of `fit`
+    (`False`, `True` or `'memory'`), or a stand-in that records nothing.
+    """
+    if not option:
+        return _NoTelemetry()
+    return Telemetry(memory = type(option) == str \
+        and option.lower() == 'memory')
@@ -2,10 +2,21 @@ import numpy as np
 # try to get rid of numpy
 __all__ = ['_sqerr_sum']
 
-def _sqerr_sum(_func_image, xdata, ydata, *parms):
+def _sqerr_sum(_func_image, xdata, ydata, *parms, chunksize = None):
     """
     Computes the sum of squared errors for some data, using _func_image format.
+    If `chunksize` is given, the residuals are computed and summed in chunks
+    of that many points, in the dtype of the data, and the partial sums are
+    accumulated in double precision.
     """
-    image = _func_image(xdata, *parms)
-    # note how this only takes x and parameters: this is the _func_image format
-    return np.sum((ydata - image) ** 2.0)
+    if chunksize is None or len(ydata) <= chunksize:
+        image = _func_image(xdata, *parms)
+        # note how this only takes x and parameters: this is the _func_image format
+        return np.sum((ydata - image) ** 2.0, dtype = np.float64)
+
+    total = 0.
+    for start in range(0, len(ydata), chunksize):
+        stop = start + chunksize
+        image = _func_image(xdata[..., start:stop], *parms)
+        total += float(np.sum((ydata[start:stop] - image) ** 2))
+    return total
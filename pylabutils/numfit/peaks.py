@@ -0,0 +1,142 @@
+import numpy as np
+
+from .fit import fit
+from .methods._peak_seeds import _peak_seeds, _peak_func, _peak_jac
+
+
+__all__ = ['fit_peaks']
+
+
+
+def fit_peaks(xdata, ydata, scope = (globals(), locals()), **options):
+    """
+    Decomposes (x, y) data into a sum of gaussian or lorentzian peaks (plus
+    an optional constant baseline). Peaks are detected in the data, and the
+    centre, width and amplitude of each component are estimated from the
+    data around it, so the fit starts close to the solution and the search
+    for `beta0` is skipped. The fit uses an analytic jacobian, which keeps
+    its cost close to linear in the number of peaks.
+
+
+    \> Parameters:
+
+
+    `xdata` : *array-like*
+
+    x-axis data.
+
+
+    `ydata` : *array-like*
+
+    y-axis data. Peaks must point upwards (use `-ydata` for dips).
+
+
+    `scope` : *`(globals(), locals())`; optional*
+
+    Same as in `fit`.
+
+
+    `npeaks` : *int or None; optional*
+
+    Amount of components to fit. The most prominent peaks are taken. If
+    `None`, every detected peak is fit.
+
+    default : `None`
+
+
+    `shape` : *`{'gaussian', 'lorentzian'}`; optional*
+
+    Shape of the components. Gaussian parameters are named `A_i`, `mu_i`
+    and `s_i` (amplitude, centre, standard deviation) and lorentzian ones
+    `A_i`, `x0_i` and `g_i` (amplitude, centre, half width), numbered from
+    left to right.
+
+    default : `'gaussian'`
+
+
+    `prominence` : *scalar or None; optional*
+
+    Minimum prominence of a detected peak. If `None`, the larger of 5% of
+    the range of `ydata` and 8 times its noise (estimated from the median
+    absolute deviation of the differences between neighbouring points) is
+    used.
+
+    default : `None`
+
+
+    `width` : *scalar or None; optional*
+
+    Minimum width of a detected peak, in points, measured at half its
+    prominence. Single point spikes and noise are not taken as peaks.
+
+    default : `2`
+
+
+    `window` : *scalar; optional*
+
+    Each centre is bound to its seed plus or minus `window` times the
+    estimated full width at half maximum of the peak.
+
+    default : `2.`
+
+
+    `baseline` : *bool; optional*
+
+    Chooses whether to fit a constant baseline `c`.
+
+    default : `True`
+
+
+    \> Other options:
+
+    Any option of `fit`, such as yerr, graph, printf or res_fmt. `beta0` and
+    `bounds` override the estimated ones.
+
+
+    \> Returns:
+
+    The `FitResult` of the fit (see `fit`), with an additional attribute
+    `seeds` holding the estimated starting values.
+
+    """
+
+    kwargs = dict(
+        npeaks = None,
+        shape = 'gaussian',
+        prominence = None,
+        width = 2,
+        window = 2.,
+        baseline = True,
+    )
+
+    peak_kwargs = {key: options.pop(key, value) \
+        for key, value in kwargs.items()}
+
+    xdata = np.asarray(xdata, dtype = float)
+    ydata = np.asarray(ydata, dtype = float)
+
+    order = np.argsort(xdata, kind = 'stable')
+    xdata, ydata = xdata[order], ydata[order]
+    for key in ['yerr', 'xerr']:
+        if options.get(key) is not None and np.ndim(options[key]) > 0:
+            options[key] = np.asarray(options[key])[order]
+    # peak widths need sorted x
+
+    seeds, lower, upper = _peak_seeds(xdata, ydata, **peak_kwargs)
+    npeaks = (len(seeds) - peak_kwargs['baseline']) // 3
+
+    func = _peak_func(npeaks, peak_kwargs['shape'], peak_kwargs['baseline'])
+
+    fit_options = dict(
+        beta0 = list(seeds),
+        bounds = (lower, upper),
+        fit_method = 'simple',
+        simple_method = 'trf',
+        jac = _peak_jac(npeaks, peak_kwargs['shape'],
+            peak_kwargs['baseline']),
+    )
+    fit_options.update(options)
+
+    result = fit(func, xdata, ydata, scope = scope, **fit_options)
+    result.seeds = seeds
+    return result
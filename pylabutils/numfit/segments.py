@@ -0,0 +1,366 @@
+import io
+import os
+import time
+import contextlib
+import concurrent.futures as cf
+
+import numpy as np
+import scipy.optimize as so
+import scipy.sparse as ssp
+
+from .fit import fit
+from .methods._fit_result import FitResult, _residual_stats
+from .methods._shared_arrays import _share_arrays, _attach_arrays
+
+from ..utils.Interval import Interval
+from ..utils.io._print_measure import _print_measure
+
+from .._tools._compile_func import _compile_func
+
+
+__all__ = ['fit_segments']
+
+
+
+def _segment_intervals(segments, x):
+    """
+    Turns the `segments` argument into a list of `Interval`. Breakpoints
+    split the range of `x` into `[x_min, b_1), [b_1, b_2), ..., [b_n, x_max]`.
+    """
+    if all(isinstance(segment, (Interval, str)) for segment in segments):
+        return [Interval(segment) for segment in segments]
+
+    ends = [float(np.min(x))] + sorted(float(b) for b in segments) \
+        + [float(np.max(x))]
+    intervals = [Interval(f'[{begin!r}, {end!r})') \
+        for begin, end in zip(ends[:-2], ends[1:-1])]
+    intervals.append(Interval(f'[{ends[-2]!r}, {ends[-1]!r}]'))
+    return intervals
+
+
+
+def _selections(intervals, x):
+    """
+    What selects the points of every segment: slices (which give views) if
+    `x` is sorted, index arrays from the vectorized masks otherwise.
+    """
+    if np.all(np.diff(x) >= 0):
+        return [slice(
+            int(np.searchsorted(x, interval.begin,
+                side = 'left' if interval.begin_included else 'right')),
+            int(np.searchsorted(x, interval.end,
+                side = 'right' if interval.end_included else 'left')),
+            ) for interval in intervals]
+    return [np.flatnonzero(interval.mask(x)) for interval in intervals]
+
+
+
+def _take(value, selection):
+    if value is None or np.ndim(value) == 0:
+        return value
+    return value[..., selection]
+
+
+
+def _run_fit(func, data, selection, scope, options):
+    """
+    Fits the points of one segment, capturing what `fit` prints. Returns
+    the `FitResult` and the printed text.
+    """
+    printed = io.StringIO()
+    with contextlib.redirect_stdout(printed):
+        result = fit(func,
+            _take(data['xdata'], selection), _take(data['ydata'], selection),
+            scope = scope,
+            yerr = _take(data['yerr'], selection),
+            xerr = _take(data['xerr'], selection),
+            **options)
+    return result, printed.getvalue()
+
+
+
+def _fit_segment(task):
+    """
+    Worker of the parallel segment fits, which reads the data from shared
+    memory. The function can only use numpy names here.
+    """
+    scope = ({}, {})
+    with _attach_arrays(task['shared']) as shared:
+        result, printed = _run_fit(task['func'], shared['data'],
+            shared['selection'], scope, task['options'])
+        if result.yerr is not None:
+            result.yerr = np.array(result.yerr) # not a view of the block
+        # fit copies its locals (the data views among them) into the scope
+        # of the compiled function, which is not sent back anyway
+        result.func_image = None
+        for names in scope:
+            names.clear()
+        del shared # the views must be gone before the block is closed
+    return result, printed
+
+
+
+def _joint_refit(results, data, selections, intervals, scope, kwargs):
+    """
+    Fits all the segments together, starting from their separate fits, with
+    additional residuals that make adjacent curves meet at the breakpoints.
+    Every residual only depends on the parameters of one segment (or two,
+    at the breakpoints), so the jacobian is given as a sparse structure.
+    """
+    if np.ndim(data['xdata']) > 1:
+        raise ValueError("continuity needs one independent variable")
+    for left, right in zip(intervals[:-1], intervals[1:]):
+        if left.end != right.begin:
+            raise ValueError(f"segments {left} and {right} are not adjacent,"
+                " continuity can not be imposed")
+
+    funcs = [_compile_func(result.func, result.parms, scope = scope) \
+        for result in results]
+    sizes = [len(result.values) for result in results]
+    starts = np.concatenate([[0], np.cumsum(sizes)]).astype(int)
+    breakpoints = [np.array([interval.end]) for interval in intervals[:-1]]
+
+    xs = [_take(data['xdata'], sel) for sel in selections]
+    ys = [_take(data['ydata'], sel) for sel in selections]
+    sigmas = [np.broadcast_to(1. if data['yerr'] is None \
+        else _take(data['yerr'], sel), np.shape(y)) \
+        for sel, y in zip(selections, ys)]
+    y_scale = float(np.median(np.concatenate(sigmas))) \
+        if data['yerr'] is not None else 1.
+    weight = kwargs['continuity_weight'] / y_scale
+
+    def _residuals(beta):
+        parts = [(func(x, *beta[a:b]) - y) / sigma for func, x, y, sigma, a, b \
+            in zip(funcs, xs, ys, sigmas, starts[:-1], starts[1:])]
+        for k, point in enumerate(breakpoints):
+            left = funcs[k](point, *beta[starts[k]:starts[k+1]])
+            right = funcs[k+1](point, *beta[starts[k+1]:starts[k+2]])
+            parts.append(weight * np.atleast_1d(left - right))
+        return np.concatenate(parts)
+
+    ndata = sum(len(y) for y in ys)
+    sparsity = ssp.lil_matrix((ndata + len(breakpoints), starts[-1]),
+        dtype = int)
+    row = 0
+    for k, y in enumerate(ys):
+        sparsity[row:row + len(y), starts[k]:starts[k+1]] = 1
+        row += len(y)
+    for k in range(len(breakpoints)):
+        sparsity[ndata + k, starts[k]:starts[k+2]] = 1
+
+    start = time.perf_counter()
+    sol = so.least_squares(_residuals,
+        np.concatenate([result.values for result in results]),
+        jac_sparsity = sparsity, method = 'trf', x_scale = 'jac')
+    elapsed = time.perf_counter() - start
+
+    jac = sol.jac.toarray() if ssp.issparse(sol.jac) else sol.jac
+    cov = np.linalg.pinv(jac.T @ jac)
+    if data['yerr'] is None or not kwargs['absolute_err']:
+        dof = ndata + len(breakpoints) - starts[-1]
+        cov = cov * np.sum(sol.fun[:ndata]**2) / max(dof, 1)
+
+    solver = dict(
+        fit_method = 'least_squares',
+        simple_method = 'trf',
+        jac = '2-point',
+        jderiv = None,
+        reasons = ["continuity at the breakpoints"],
+    )
+
+    joint = []
+    for k, result in enumerate(results):
+        a, b = starts[k], starts[k+1]
+        dof, res_var, chi2 = _residual_stats(funcs[k], xs[k], ys[k],
+            sol.x[a:b], yerr = None if data['yerr'] is None else sigmas[k])
+        joint.append(FitResult(result.parms, sol.x[a:b],
+            np.sqrt(np.diag(cov[a:b, a:b])), solver = solver,
+            func = result.func, cov = cov[a:b, a:b], dof = dof,
+            res_var = res_var, chi2 = chi2, status = int(sol.status),
+            message = sol.message,
+            elapsed = result.elapsed + elapsed / len(results),
+            func_image = funcs[k], yerr = result.yerr,
+            absolute_err = kwargs['absolute_err']))
+        # the joint fit time is shared out between the segments
+    return joint
+
+
+
+def fit_segments(funcs, xdata, ydata, segments,
+        scope = (globals(), locals()), **options):
+    """
+    Fits the regimes of a sweep separately: the data is split into segments
+    (given as `Interval`s or as breakpoints) and each one is fit to its own
+    model, one after the other or concurrently on a pool of processes.
+    Optionally the curves of adjacent segments are made to meet at the
+    breakpoints.
+
+    Usage example:
+
+    `>>> low, high = fit_segments(['y = {a}*x', 'y = {b}*x**2'], B, M,`
+    `...     [Interval('[0, 1)'), Interval('[1, 5]')], beta0 = [1])`
+
+
+    \> Parameters:
+
+    `funcs` : *str or N x str*
+
+    Model of every segment, with the same format as in `fit`, or a single
+    one for all of them. Parameters are independent between segments even
+    if they have the same name.
+
+
+    `xdata`, `ydata` : *array-like*
+
+    Data of the whole sweep. With several independent variables, the
+    segments are taken along the first one.
+
+
+    `segments` : *N x Interval (or str) or M x scalar*
+
+    Intervals of x of every segment, or breakpoints splitting the range of
+    the data into `M + 1` segments, `[x_min, b_1), ..., [b_M, x_max]`.
+
+
+    `scope` : *`(globals(), locals())`; optional*
+
+    Same as in `fit`. In the worker processes, functions can only use numpy
+    (as `np` or `numpy`).
+
+
+    `processes` : *int or None; optional*
+
+    Amount of worker processes. With `1`, the segments are fit in the
+    current process, with `scope` available. If `None`, as many as CPUs
+    (but not more than segments). Starting the pool costs more than fitting
+    a few small segments, so it pays off for many or slow fits only. The
+    data is placed once in shared memory, from which the workers read their
+    segment without copies.
+
+    default : `1`
+
+
+    `segment_options` : *N x dict or None; optional*
+
+    Options of `fit` for every segment, added to the common ones (e.g. a
+    different `beta0` for every model).
+
+    default : `None`
+
+
+    `continuity` : *bool; optional*
+
+    Chooses whether the curves of adjacent segments must meet at their
+    common end. After the separate fits, all the segments are fit together
+    by least squares (x errors are ignored) with one extra residual per
+    breakpoint, `continuity_weight` times the difference between the two
+    curves there (in units of the typical y error, if given).
+
+    default : `False`
+
+
+    `continuity_weight` : *float; optional*
+
+    Weight of the continuity residuals.
+
+    default : `1e3`
+
+
+    `printres` : *bool; optional*
+
+    Chooses whether to print the parameters found for every segment.
+
+    default : `True`
+
+
+    \> Other options:
+
+    Any option of `fit`, used for every segment. Graphs are off by default
+    and are only drawn when fitting in the current process.
+
+
+    \> Returns:
+
+    A list with one `FitResult` for each segment, in order, with an
+    additional attribute `segment` holding its `Interval`.
+
+    """
+
+    kwargs = dict(
+        processes = 1,
+        segment_options = None,
+        continuity = False,
+        continuity_weight = 1e3,
+        printres = True,
+    )
+
+    segment_kwargs = {key: options.pop(key, value) \
+        for key, value in kwargs.items()}
+    options.setdefault('graph', False)
+
+    data = dict(
+        xdata = np.asarray(xdata, dtype = float),
+        ydata = np.asarray(ydata, dtype = float),
+        yerr = options.pop('yerr', None),
+        xerr = options.pop('xerr', None),
+    )
+    for key in ['yerr', 'xerr']:
+        if data[key] is not None and np.ndim(data[key]) > 0:
+            data[key] = np.asarray(data[key], dtype = float)
+
+    x = data['xdata'] if data['xdata'].ndim == 1 else data['xdata'][0]
+    intervals = _segment_intervals(segments, x)
+    selections = _selections(intervals, x)
+
+    nsegments = len(intervals)
+    funcs = [funcs] * nsegments if type(funcs) == str else list(funcs)
+    if len(funcs) != nsegments:
+        raise ValueError(f"got {len(funcs)} functions for {nsegments}"
+            " segments")
+
+    every_options = []
+    for k in range(nsegments):
+        segment_options = dict(options)
+        if segment_kwargs['segment_options'] is not None:
+            segment_options.update(segment_kwargs['segment_options'][k])
+        every_options.append(segment_options)
+
+    processes = min(segment_kwargs['processes'] or os.cpu_count() or 1,
+        nsegments)
+    if processes <= 1:
+        fits = [_run_fit(func, data, selection, scope, segment_options) \
+            for func, selection, segment_options \
+            in zip(funcs, selections, every_options)]
+    else:
+        with _share_arrays(dict(data = data, selections = selections)) \
+                as shared:
+            tasks = [dict(
+                func = func,
+                shared = dict(data = shared['data'], selection = selection),
+                options = dict(segment_options, graph = False),
+                ) for func, selection, segment_options \
+                in zip(funcs, shared['selections'], every_options)]
+
+            with cf.ProcessPoolExecutor(max_workers = processes) as executor:
+                fits = list(executor.map(_fit_segment, tasks))
+
+    results = [result for result, _ in fits]
+
+    if segment_kwargs['continuity'] and nsegments > 1:
+        results = _joint_refit(results, data, selections, intervals, scope,
+            dict(segment_kwargs,
+                absolute_err = options.get('absolute_err', True)))
+
+    for k, (result, interval) in enumerate(zip(results, intervals)):
+        result.segment = interval
+        if segment_kwargs['printres']:
+            print(f"segment {interval}:")
+            if segment_kwargs['continuity'] and nsegments > 1:
+                for name, val, unc in \
+                        zip(result.parms, result.values, result.uncertainties):
+                    _print_measure(val, unc, name = name,
+                        fmt = options.get('res_fmt', '.2uL'))
+            else:
+                print(fits[k][1], end = '')
+
+    return results
@@ -0,0 +1,293 @@
+import json
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+__all__ = ['FitStore']
+
+
+
+class FitStore:
+    """
+    Columnar storage for the results of many fits of the same function.
+    Values, uncertainties, chi squared, degrees of freedom, status and fit
+    times are kept in preallocated numpy columns (one row per fit), and can
+    be written to disk as they are appended, so thousands of fits never
+    become lists of python objects.
+
+    If `path` ends in `.npz`, every flush adds the rows as new members of
+    the zip file. Otherwise `path` is a directory with one raw binary file
+    per column (plus `meta.json`), which `FitStore.open` maps into memory
+    lazily for later analysis.
+
+    Usage example:
+
+    `>>> with FitStore(['A', 'B'], 'fits') as store:`
+
+    `...     for xdata, ydata in sweeps:`
+
+    `...         store.append(fit(func, xdata, ydata))`
+
+    `>>> FitStore.open('fits').to_dataframe()`
+
+
+    \> Parameters:
+
+    `parms` : *N x str*
+
+    Names of the parameters, in the order of `FitResult.parms`.
+
+
+    `path` : *str or None; optional*
+
+    File (`.npz`) or directory where the results are written. If `None`,
+    the store only lives in memory and grows as needed.
+
+    default : `None`
+
+
+    `capacity` : *int; optional*
+
+    Amount of rows kept in memory before they are flushed to `path` (or
+    the initial size of an in-memory store).
+
+    default : `1024`
+
+    """
+
+    _scalars = dict(chi2 = '<f8', dof = '<i8', status = '<i4',
+        elapsed = '<f8')
+
+
+    def __init__(self, parms, path = None, capacity = 1024):
+        self.parms = list(parms)
+        self.path = None if path is None else Path(path)
+        self.capacity = max(int(capacity), 1)
+
+        self._columns = dict(
+            values = ('<f8', (len(self.parms),)),
+            uncertainties = ('<f8', (len(self.parms),)),
+        )
+        self._columns.update(
+            {name: (dtype, ()) for name, dtype in self._scalars.items()})
+
+        self._buffer = self._empty(self.capacity)
+        self._nbuffer = 0
+        self._nflushed = 0
+        self._nchunks = 0
+        self._readonly = False
+        self._opened = {}
+
+        if self.path is not None:
+            self._create()
+
+
+    def _empty(self, nrows):
+        return {name: np.empty((nrows,) + shape, dtype = dtype) \
+            for name, (dtype, shape) in self._columns.items()}
+
+
+    def _is_npz(self):
+        return self.path.suffix == '.npz'
+
+
+    def _meta(self):
+        return dict(parms = self.parms, count = self._nflushed,
+            chunks = self._nchunks)
+
+
+    def _create(self):
+        """
+        Creates (or overwrites) the files of the store.
+        """
+        if self._is_npz():
+            self.path.parent.mkdir(parents = True, exist_ok = True)
+            with zipfile.ZipFile(self.path, 'w') as archive:
+                archive.writestr('meta.json', json.dumps(self._meta()))
+            return
+
+        self.path.mkdir(parents = True, exist_ok = True)
+        for name in self._columns:
+            open(self.path / f'{name}.bin', 'wb').close()
+        (self.path / 'meta.json').write_text(json.dumps(self._meta()))
+
+
+    def append(self, result):
+        """
+        Adds the `FitResult` of one fit as a new row.
+        """
+        if self._readonly:
+            raise ValueError("the store was opened for reading")
+        if list(result.parms) != self.parms:
+            raise ValueError(f"the result has the parameters {result.parms},"
+                f" the store {self.parms}")
+
+        if self._nbuffer == len(self._buffer['chi2']):
+            if self.path is not None:
+                self.flush()
+            else:
+                # in memory only, the columns double their size
+                grown = self._empty(2 * self._nbuffer)
+                for name, column in self._buffer.items():
+                    grown[name][:self._nbuffer] = column
+                self._buffer = grown
+
+        row = self._nbuffer
+        self._buffer['values'][row] = result.values
+        self._buffer['uncertainties'][row] = result.uncertainties
+        for name, missing in [('chi2', np.nan), ('dof', -1),
+                ('status', -1), ('elapsed', np.nan)]:
+            value = getattr(result, name, None)
+            self._buffer[name][row] = missing if value is None else value
+        self._nbuffer += 1
+
+
+    def extend(self, results):
+        """
+        Adds the `FitResult` of every fit in `results`.
+        """
+        for result in results:
+            self.append(result)
+
+
+    def flush(self):
+        """
+        Writes the rows kept in memory to `path`.
+        """
+        if self.path is None or self._readonly or not self._nbuffer:
+            return
+
+        rows = {name: np.ascontiguousarray(column[:self._nbuffer]) \
+            for name, column in self._buffer.items()}
+
+        if self._is_npz():
+            with zipfile.ZipFile(self.path, 'a') as archive:
+                for name, column in rows.items():
+                    with archive.open(f'{name}_{self._nchunks:06d}.npy',
+                            'w', force_zip64 = True) as member:
+                        np.lib.format.write_array(member, column)
+        else:
+            for name, column in rows.items():
+                with open(self.path / f'{name}.bin', 'ab') as file:
+                    file.write(column.tobytes())
+
+        self._nflushed += self._nbuffer
+        self._nchunks += 1
+        self._nbuffer = 0
+
+        if self._is_npz():
+            # zip members can not be replaced, the last meta.json is read
+            with zipfile.ZipFile(self.path, 'a') as archive:
+                archive.writestr(f'meta_{self._nchunks:06d}.json',
+                    json.dumps(self._meta()))
+        else:
+            (self.path / 'meta.json').write_text(json.dumps(self._meta()))
+        self._opened.clear()
+
+
+    def close(self):
+        """
+        Flushes the store. It can still be read afterwards.
+        """
+        self.flush()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+    @classmethod
+    def open(cls, path):
+        """
+        Reopens a store written to `path` for reading. Directory stores are
+        mapped into memory, column by column, only when they are accessed;
+        `.npz` stores are read into memory.
+        """
+        path = Path(path)
+        if path.suffix == '.npz':
+            with zipfile.ZipFile(path) as archive:
+                metas = sorted(name for name in archive.namelist() \
+                    if name.startswith('meta'))
+                meta = json.loads(archive.read(metas[-1]))
+        else:
+            meta = json.loads((path / 'meta.json').read_text())
+
+        store = cls(meta['parms'], capacity = 1)
+        store.path = path
+        store._nflushed = meta['count']
+        store._nchunks = meta['chunks']
+        store._readonly = True
+        return store
+
+
+    def _stored(self, name):
+        """
+        The rows of a column that are already in `path`.
+        """
+        if name in self._opened:
+            return self._opened[name]
+
+        dtype, shape = self._columns[name]
+        if self._nflushed == 0:
+            column = np.empty((0,) + shape, dtype = dtype)
+        elif self._is_npz():
+            with np.load(self.path) as archive:
+                column = np.concatenate([archive[f'{name}_{chunk:06d}'] \
+                    for chunk in range(self._nchunks)])
+        else:
+            column = np.memmap(self.path / f'{name}.bin', dtype = dtype,
+                mode = 'r', shape = (self._nflushed,) + shape)
+
+        self._opened[name] = column
+        return column
+
+
+    def column(self, name):
+        """
+        Every row of the column `name` (`'values'`, `'uncertainties'`,
+        `'chi2'`, `'dof'`, `'status'` or `'elapsed'`).
+        """
+        if name not in self._columns:
+            raise KeyError(name)
+
+        buffered = self._buffer[name][:self._nbuffer]
+        if self.path is None:
+            return buffered
+        if not self._nbuffer:
+            return self._stored(name)
+        return np.concatenate([self._stored(name), buffered])
+
+
+    values = property(lambda self: self.column('values'))
+    uncertainties = property(lambda self: self.column('uncertainties'))
+    chi2 = property(lambda self: self.column('chi2'))
+    dof = property(lambda self: self.column('dof'))
+    status = property(lambda self: self.column('status'))
+    elapsed = property(lambda self: self.column('elapsed'))
+
+
+    def __len__(self):
+        return self._nflushed + self._nbuffer
+
+
+    def to_dataframe(self):
+        """
+        The store as a `pandas.DataFrame`, with one row per fit and the
+        columns `<parm>`, `<parm>_err`, `chi2`, `dof`, `status` and
+        `elapsed`, ready for `tex_table`.
+        """
+        values, uncertainties = self.values, self.uncertainties
+        columns = {}
+        for i, parm in enumerate(self.parms):
+            columns[parm] = values[:, i]
+            columns[f'{parm}_err'] = uncertainties[:, i]
+        for name in self._scalars:
+            columns[name] = self.column(name)
+        return pd.DataFrame(columns)
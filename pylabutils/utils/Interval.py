@@ -1,5 +1,7 @@
 import re
 
+import numpy as np
+
 __all__ = ['Interval']
 
 class Interval:
@@ -79,6 +81,19 @@ class Interval:
             return False
 
 
+    def mask(self, values):
+        """
+        Vectorized `in`: boolean array telling which of `values` are in the
+        interval.
+        """
+        values = np.asarray(values)
+        above = values >= self.begin if self.begin_included \
+            else values > self.begin
+        below = values <= self.end if self.end_included \
+            else values < self.end
+        return above & below
+
+
     def __eq__(self, other):
         if not isinstance(other, Interval):
             return False
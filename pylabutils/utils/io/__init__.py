@@ -5,7 +5,11 @@ Collection of methods/functions/classes regarding input and output of data.
 from ._plot_fit import _plot_fit
 from ._print_measure import _print_measure
 from .read_data import read_data
+from .write_data import write_data
+from .render_fits import render_fits
+from .live_plot import LivePlot
 from .tex_table import tex_table, _tex_table_values
 from .wdir import wdir
 
-__all__ = ['read_data', 'tex_table', 'wdir']
\ No newline at end of file
+__all__ = ['read_data', 'write_data', 'render_fits', 'LivePlot', 'tex_table',
+    'wdir']
\ No newline at end of file
@@ -0,0 +1,155 @@
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+__all__ = ['_ReadCache', '_read_cache', '_file_key']
+
+
+_sidecar_dir = '.pylabutils_cache'
+
+
+
+def _file_key(filename, options):
+    """
+    Identity of a read: the absolute path, the modification time and size
+    of the file (so that edited files are reparsed) and the options that
+    change the result.
+    """
+    stat = os.stat(filename)
+    return (os.path.abspath(filename), stat.st_mtime_ns, stat.st_size,
+        repr(sorted(options.items())))
+
+
+
+def _nbytes(data):
+    return int(data.memory_usage(index = True, deep = True).sum())
+
+
+
+class _ReadCache:
+    """
+    Cache of parsed files in two tiers: an LRU of frames in memory, limited
+    to `max_bytes`, and optional sidecar directories with one `.npy` file
+    per column, which later runs map into memory instead of reparsing.
+    """
+
+    def __init__(self, max_bytes = 256 * 2**20):
+        self.max_bytes = max_bytes
+        self._frames = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock() # files can be read from many threads
+
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._bytes = 0
+
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._frames:
+                return None
+            self._frames.move_to_end(key)
+            data = self._frames[key][0]
+        return data.copy()
+
+
+    def put(self, key, data):
+        size = _nbytes(data)
+        if size > self.max_bytes:
+            return # would push everything else out
+
+        data = data.copy()
+        with self._lock:
+            if key in self._frames:
+                self._bytes -= self._frames.pop(key)[1]
+            self._frames[key] = (data, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._bytes -= self._frames.popitem(last = False)[1][1]
+
+
+    @staticmethod
+    def _sidecar(key, directory):
+        """
+        Sidecar directory of a read, one per file and set of options.
+        """
+        path, _, _, options = key
+        if directory is True:
+            directory = Path(path).parent / _sidecar_dir
+        digest = hashlib.sha1(f'{path}|{options}'.encode()).hexdigest()[:16]
+        return Path(directory) / f'{Path(path).name}-{digest}'
+
+
+    def load(self, key, directory):
+        """
+        Maps the sidecar of a read into a frame, or returns `None` if there
+        is none or the file changed since it was written.
+        """
+        sidecar = self._sidecar(key, directory)
+        try:
+            meta = json.loads((sidecar / 'meta.json').read_text())
+        except (OSError, ValueError):
+            return None
+        if [meta['mtime_ns'], meta['size']] != list(key[1:3]):
+            return None
+
+        columns = {}
+        for i, (dtype, mapped) in \
+                enumerate(zip(meta['dtypes'], meta['mapped'])):
+            # python objects (strings) can not be mapped, they're unpickled
+            values = np.load(sidecar / f'col_{i:05d}.npy',
+                mmap_mode = 'r' if mapped else None,
+                allow_pickle = True) # only our own files are loaded
+            column = pd.Series(values, copy = False)
+            if str(column.dtype) != dtype:
+                column = column.astype(dtype)
+            columns[i] = column
+
+        data = pd.DataFrame(columns, copy = False)
+        data.columns = meta['columns']
+        data.attrs.update(meta['attrs'])
+        return data
+
+
+    def save(self, key, directory, data):
+        """
+        Writes the sidecar of a read. Failing to write it is not an error,
+        the next run just parses the file again.
+        """
+        sidecar = self._sidecar(key, directory)
+        try:
+            sidecar.mkdir(parents = True, exist_ok = True)
+            try:
+                (sidecar / 'meta.json').unlink()
+            except FileNotFoundError:
+                pass
+            mapped = []
+            for i in range(data.shape[1]):
+                values = data.iloc[:, i].to_numpy()
+                np.save(sidecar / f'col_{i:05d}.npy', values,
+                    allow_pickle = True)
+                mapped.append(not values.dtype.hasobject)
+            meta = dict(
+                mtime_ns = key[1],
+                size = key[2],
+                columns = list(data.columns),
+                dtypes = [str(dtype) for dtype in data.dtypes],
+                mapped = mapped,
+                attrs = data.attrs,
+            )
+            # written last, so that half written sidecars are never read
+            (sidecar / 'meta.json').write_text(json.dumps(meta))
+        except (OSError, TypeError):
+            pass
+
+
+
+_read_cache = _ReadCache()
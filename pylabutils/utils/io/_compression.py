@@ -0,0 +1,76 @@
+import bz2
+import gzip
+import lzma
+import importlib.util
+
+__all__ = ['_open_binary', '_file_kind']
+
+
+_has_zstandard = importlib.util.find_spec('zstandard') is not None
+
+_openers = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+    '.zst': None, # zstandard is optional, see _open_binary
+}
+
+_text_types = ['.csv', '.txt', '.md']
+_binary_types = dict(
+    parquet = ['.parquet', '.pq'],
+    feather = ['.feather', '.arrow'],
+    npz = ['.npz'],
+    hdf5 = ['.h5', '.hdf5', '.hdf'],
+)
+
+
+
+def _compression(filename):
+    """
+    Compression suffix of a file name (`'.gz'`, `'.bz2'`, `'.xz'`, `'.zst'`)
+    or `None`.
+    """
+    for suffix in _openers:
+        if filename.endswith(suffix):
+            return suffix
+    return None
+
+
+
+def _file_kind(filename):
+    """
+    What `read_data` reads the file as: `'text'`, `'excel'`, `'parquet'`,
+    `'feather'`, `'npz'`, `'hdf5'` or `None` if it can't. Compressed (text)
+    files are whatever is inside of them.
+    """
+    compression = _compression(filename)
+    if compression is not None:
+        filename = filename[:-len(compression)]
+        if not list(filter(filename.endswith, _text_types)):
+            return None # the others need random access
+    if filename.endswith('.xlsx'):
+        return 'excel'
+    if list(filter(filename.endswith, _text_types)):
+        return 'text'
+    for kind, suffixes in _binary_types.items():
+        if list(filter(filename.endswith, suffixes)):
+            return kind
+    return None
+
+
+
+def _open_binary(filename):
+    """
+    Opens a file for reading bytes, decompressing it on the fly (as it is
+    read, without temporary files) if it is compressed.
+    """
+    compression = _compression(filename)
+    if compression is None:
+        return open(filename, 'rb')
+    if compression == '.zst':
+        if not _has_zstandard:
+            raise ImportError("reading .zst files needs the zstandard"
+                " package (pip install zstandard)")
+        import zstandard
+        return zstandard.open(filename, 'rb')
+    return _openers[compression](filename, 'rb')
@@ -0,0 +1,119 @@
+import numpy as np
+
+__all__ = ['_lttb', '_minmax', '_downsample']
+
+
+
+def _lttb(x, y, n):
+    """
+    Largest-triangle-three-buckets: picks `n` of the (sorted) points keeping
+    the visual shape of the series. Returns the chosen indices and the
+    bucket every original point belongs to.
+    """
+    npoints = len(x)
+    edges = np.linspace(1, npoints - 1, n - 1).astype(int)
+    # n - 2 buckets between the first and the last points, kept as they are
+
+    chosen = np.empty(n, dtype = int)
+    chosen[0], chosen[-1] = 0, npoints - 1
+
+    a = 0
+    for k in range(n - 2):
+        lo, hi = edges[k], edges[k+1]
+        next_hi = edges[k+2] if k + 2 < len(edges) else npoints
+        avg_x = x[hi:next_hi].mean()
+        avg_y = y[hi:next_hi].mean()
+        # twice the area of the triangles (a, point, next bucket average)
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) \
+            - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        chosen[k+1] = a
+
+    buckets = np.searchsorted(edges, np.arange(npoints), side = 'right')
+    buckets[-1] = n - 1
+    return chosen, buckets
+
+
+
+def _minmax(x, y, n):
+    """
+    Keeps the minimum and the maximum of each of `n // 2` buckets of (sorted)
+    points, so no peak is lost. Returns the chosen indices and the bucket
+    every original point belongs to.
+    """
+    npoints = len(x)
+    nbuckets = max(n // 2, 1)
+    starts = np.linspace(0, npoints, nbuckets + 1).astype(int)
+    buckets = np.repeat(np.arange(nbuckets), np.diff(starts))
+
+    order = np.lexsort((y, buckets))
+    # sorted by bucket, then by y: the first and last of every bucket
+    firsts, lasts = order[starts[:-1]], order[starts[1:] - 1]
+
+    chosen = np.sort(np.concatenate([firsts, lasts]))
+    chosen = chosen[np.concatenate([[True], np.diff(chosen) > 0])]
+    return chosen, buckets[chosen], buckets
+
+
+
+def _aggregate_err(err, buckets, nbuckets):
+    """
+    Root mean square of the errors of every bucket. `err` can be `None`, a
+    scalar, an N array or a 2 x N array (asymmetric errors).
+    """
+    if err is None or np.ndim(err) == 0:
+        return err
+
+    err = np.asarray(err, dtype = float)
+    counts = np.bincount(buckets, minlength = nbuckets)
+    counts = np.maximum(counts, 1)
+
+    def _rms(row):
+        return np.sqrt(np.bincount(buckets, weights = row**2,
+            minlength = nbuckets) / counts)
+
+    if err.ndim == 2:
+        return np.vstack([_rms(row) for row in err])
+    return _rms(err)
+
+
+
+def _downsample(x, y, xerr = None, yerr = None, method = 'lttb', n = 2000):
+    """
+    Reduces a data series to about `n` points for plotting with the shape
+    preserving `method` ('lttb' or 'minmax'), aggregating the error bars of
+    each bucket into the point(s) kept for it. Returns the new
+    `(x, y, xerr, yerr)`.
+    """
+    x, y = np.asarray(x, dtype = float), np.asarray(y, dtype = float)
+    if len(x) <= n or n < 3:
+        return x, y, xerr, yerr
+
+    order = None
+    if np.any(np.diff(x) < 0):
+        order = np.argsort(x, kind = 'stable')
+        x, y = x[order], y[order]
+
+    def _sorted(err):
+        if order is None or err is None or np.ndim(err) == 0:
+            return err
+        return np.asarray(err)[..., order]
+
+    xerr, yerr = _sorted(xerr), _sorted(yerr)
+
+    if method == 'lttb':
+        chosen, buckets = _lttb(x, y, n)
+        nbuckets = n
+        kept_buckets = np.arange(n)
+    elif method == 'minmax':
+        chosen, kept_buckets, buckets = _minmax(x, y, n)
+        nbuckets = buckets[-1] + 1
+    else:
+        raise ValueError(f"{method!r} is not a valid downsampling method")
+
+    def _reduce(err):
+        if err is None or np.ndim(err) == 0:
+            return err
+        return _aggregate_err(err, buckets, nbuckets)[..., kept_buckets]
+
+    return x[chosen], y[chosen], _reduce(xerr), _reduce(yerr)
@@ -1,23 +1,30 @@
 import re
 import copy
+import warnings
 
 import numpy as np
 import matplotlib.pyplot as plt
 
 from ..._tools._colors import color_dict
+from ..._tools._compile_func import _compile_func
+from ._downsample import _downsample
+from ._sampling import _sample_curve
+from ._tex_render import _set_tex_cache, _axes_texts, _warm_tex_cache, \
+    _Timings
 
 
-__all__ = ['_plot_fit']
+__all__ = ['_plot_fit', '_plot_fit_defaults', '_graph_series',
+    '_graph_texts', '_draw_graph', '_figure_name']
 
 
 
-def _plot_fit(xdata, ydata, scope = (globals(), locals()), **options):
+def _plot_fit_defaults():
     """
-    Plots for fit functions.
+    Default options for the fit graphs.
     """
-
-    kw = dict(
+    return dict(
         func_str = None, # additional kwarg, does not appear in fit()
+        fit_result = None, # same, needed for the bands
         # add _func_image option instead of specifying func by str
         yerr = None,
         xerr = None,
@@ -42,15 +49,32 @@ def _plot_fit(xdata, ydata, scope = (globals(), locals()), **options):
         errorevery = 1,
         barsabove = False,
         linspace_vals = 400,
+        bands = False,
+        band_level = 0.95,
+        band_alpha = 0.25,
+        sampling = 'linspace',
+        sampling_tol = 1e-3,
+        sampling_max = 5000,
+        xscale = 'linear',
+        yscale = 'linear',
         linewidth = 1.5,
         markersize = 6.0,
         markevery = 1,
         fillstyle = 'full',
+        tex_cache = None,
+        downsample = 'lttb',
+        downsample_threshold = 10000,
+        downsample_points = 2000,
     ) # default kwargs values
 
-    defaults = copy.deepcopy(kw)
-    kw.update(options)
 
+
+def _graph_series(xdata, ydata, kw, scope = (globals(), locals())):
+    """
+    Computes what is drawn in each of the three fit graphs: returns a dict
+    with the indices of the selected graphs and the x, y, errors and caps
+    of every graph, or `None` if there is nothing to draw.
+    """
     if type(kw['func_str']) != str:
         raise ValueError("missing essential keyword argument `func_str`")
 
@@ -60,44 +84,212 @@ def _plot_fit(xdata, ydata, scope = (globals(), locals()), **options):
     if not kw['graph'] or not any(kw['graph']):
         return None
 
-    xloc = re.search(r'(?<=[\s\*\+\/\%\(])x(?=[\s\*\+\/\%\)])',
-        ' '+kw['func_str']+' ').start()-1
-    tempf = [kw['func_str'][i] if i != xloc else 'xdata' \
-        for i in range(len(kw['func_str']))]
-    kw['func_str'] = copy.deepcopy(''.join(tempf))
-
     # graph plots
     xdata = np.array(xdata)
-    xvals = np.linspace( \
-        float(min(xdata)), float(max(xdata)), kw['linspace_vals'])
+    if xdata.ndim > 1:
+        warnings.warn("graphs are only available for functions of one"
+            " independent variable")
+        return None
+
+    _func_image = _compile_func(kw['func_str'], [], scope = scope)
+    # the values are already in the string, so it is a function of x only
+
+    xvals, yvals = _sample_curve(_func_image,
+        float(min(xdata)), float(max(xdata)), kw)
 
     if kw['errorbars']:
         yerr = np.array(kw['yerr']) if kw['yerr'] \
             is not None else None
         xerr = np.array(kw['xerr']) if kw['xerr'] \
             is not None else None
+    else:
+        yerr, xerr = None, None
 
-    dense_curve = re.sub('xdata', 'xvals', kw['func_str'])
+    # I want to get the indices for the selected graphs
+    graphs = [graph for graph in range(len(kw['graph'])) \
+        if kw['graph'][graph] == True]
 
-    scope[0].update(globals())
-    scope[1].update(locals())
+    series = dict(
+        graphs = graphs,
+        xs = [xdata, xvals, xdata],
+        xerrs = [xerr, None, xerr],
+        ys = [
+              ydata,
+              yvals,
+              _func_image(xdata) if 2 in graphs else None
+             ],
+        yerrs = [yerr, None, yerr],
+        capsizes = [kw['capsize'], None, kw['capsize']],
+        bands = [],
+    )
+
+    if kw['bands'] and 1 in graphs:
+        if kw['fit_result'] is None:
+            raise ValueError("the bands need the `fit_result` option")
+        for band in (kw['bands'] if type(kw['bands']) in (list, tuple) \
+                else [kw['bands']]):
+            if band not in ('confidence', 'prediction'):
+                raise ValueError(f"{band!r} is not a valid band")
+            band_func = getattr(kw['fit_result'], f'{band}_band')
+            series['bands'].append(band_func(xvals, level = kw['band_level']))
+
+    # only the drawing is downsampled, the fit has used all of the data
+    if kw['downsample'] and len(xdata) > kw['downsample_threshold']:
+        for j in [0, 2]:
+            if j in graphs:
+                series['xs'][j], series['ys'][j], \
+                    series['xerrs'][j], series['yerrs'][j] = _downsample(
+                        series['xs'][j], series['ys'][j],
+                        xerr = series['xerrs'][j], yerr = series['yerrs'][j],
+                        method = kw['downsample'],
+                        n = kw['downsample_points'],
+                        )
+
+    return series
+
+
+
+def _graph_texts(kw):
+    """
+    Returns every title and label string of the fit graphs.
+    """
+    texts = []
+    for option in ['titles', 'labels', 'axis_labels']:
+        values = kw[option] if type(kw[option]) in (list, tuple) \
+            else [kw[option]]
+        texts += [value for value in values if type(value) == str]
+    return texts
 
-    xs = [xdata, xvals, xdata]
-    xerrs = [xerr, None, xerr]
-    ys = [
-          ydata,
-          eval(dense_curve, scope[0], scope[1]),
-          eval(kw['func_str'], scope[0], scope[1])
-         ]
-    yerrs = [yerr, None, yerr]
 
-    capsizes = [kw['capsize'], None, kw['capsize']]
 
+def _draw_graph(ax, i, j, series, kw, defaults):
+    """
+    Draws the fit graph `j` (the `i`-th selected one) onto a
+    `matplotlib.axes.Axes`.
+    """
+    color = (color_dict[kw['colors'][i]] \
+            if kw['colors'][i] in color_dict.keys() \
+            else kw['colors'][i]) \
+        if kw['colors'] != defaults['colors'] \
+        else defaults['colors'][j]
+
+    if j == 1:
+        for lower, upper in series['bands']:
+            ax.fill_between(series['xs'][j], lower, upper, color = color,
+                alpha = kw['band_alpha'], linewidth = 0)
+
+    ax.errorbar(
+        series['xs'][j], series['ys'][j],
+        yerr = series['yerrs'][j], xerr = series['xerrs'][j],
+        capsize = series['capsizes'][j],
+        color = color,
+        marker = kw['markers'][i] if kw['markers'] \
+            != defaults['markers'] else defaults['markers'][j],
+        linestyle = kw['linestyles'][i] if kw['linestyles'] \
+            != defaults['linestyles'] else defaults['linestyles'][j],
+        label = r'{}'.format(
+            (kw['labels'][i] if (
+                type(kw['labels']) == list \
+                and len(kw['labels']) == 3 \
+                and kw['split'] == True) \
+            else kw['labels']) if kw['labels'] \
+            != defaults['labels'] else defaults['labels'][j]),
+        linewidth = kw['linewidth'],
+        ecolor = kw['ecolor'],
+        elinewidth = kw['elinewidth'],
+        errorevery = kw['errorevery'],
+        barsabove = kw['barsabove'],
+        markersize = kw['markersize'],
+        fillstyle = kw['fillstyle'],
+        markevery = kw['markevery'],
+        )
+        # **kwargs, but careful not to override things
+
+    if kw['xscale'] != 'linear':
+        ax.set_xscale(kw['xscale'])
+    if kw['yscale'] != 'linear':
+        ax.set_yscale(kw['yscale'])
+
+    if kw['xlim']:
+        ax.set_xlim(kw['xlim'])
+    if kw['ylim']:
+        ax.set_ylim(kw['ylim'])
+
+    if type(kw['titles']) == str:
+        ax.set_title(r'{}'.format(kw['titles']))
+    elif type(kw['titles']) == list \
+            and type(kw['titles'][i]) == str:
+        ax.set_title(r'{}'.format(kw['titles'][i] \
+            if kw['titles'] != defaults['titles'] \
+            else defaults['titles'][j]))
+
+    if type(kw['axis_labels'][0]) == str:
+        ax.set_xlabel(r'{}'.format(kw['axis_labels'][0]))
+    if type(kw['axis_labels'][1]) == str:
+        ax.set_ylabel(r'{}'.format(kw['axis_labels'][1]))
+
+    if type(kw['legend']) == str:
+        ax.legend(loc = kw['legend'])
+    elif kw['legend'] == True:
+        ax.legend(loc = 'best')
+
+
+
+def _figure_name(save, split, i, graphs):
+    """
+    File name the `i`-th selected fit graph is saved as, or `None` if it is
+    not to be saved.
+    """
     fignames = ['_data', '_curve', '_fit_data']
 
-    # I want to get the indices for the selected graphs
-    graphs = [graph for graph in range(len(kw['graph'])) \
-        if kw['graph'][graph] == True]
+    if type(save) == str or save == True:
+        # this works bad, redo
+        if split == False and type(save) == str:
+            return save + '{}'.format('.pdf' if '.' not in save else '')
+
+        elif split == False and save == True:
+            return 'figure.pdf'
+
+        elif type(save) == str:
+            if '.' in save:
+                wf = re.search(r'\.', save).start()
+                # wf, like where_format, where the . is in the savename
+                return save[:wf] + fignames[i] + save[wf:]
+            else:
+                return save + fignames[i] + '.pdf'
+
+        else:
+            return ['data_scatter.pdf', 'fit_curve.pdf', 'fit_data.pdf'][i]
+
+    elif type(save) == list and len(save) == len(graphs):
+        return '{}{}'.format(save[i], '.pdf' if '.' not in save[i] else '')
+
+    return None
+
+
+
+def _plot_fit(xdata, ydata, scope = (globals(), locals()), **options):
+    """
+    Plots for fit functions.
+    """
+
+    kw = _plot_fit_defaults()
+
+    defaults = copy.deepcopy(kw)
+    kw.update(options)
+
+    usetex = plt.rcParams['text.usetex']
+    if usetex and kw['tex_cache']:
+        _set_tex_cache(kw['tex_cache'])
+
+    timings = _Timings()
+    with timings.stage('series'):
+        series = _graph_series(xdata, ydata, kw, scope = scope)
+    if series is None:
+        return None
+
+    figure_timings = []
+    graphs = series['graphs']
     for i, j in enumerate(graphs):
     # amazing implementation :)
 
@@ -105,92 +297,20 @@ def _plot_fit(xdata, ydata, scope = (globals(), locals()), **options):
             plt.figure(figsize = kw['sizes'][i] if kw['sizes'] \
                 != defaults['sizes'] else defaults['sizes'][j])
 
-        plt.errorbar(
-            xs[j], ys[j],
-            yerr = yerrs[j], xerr = xerrs[j],
-            capsize = capsizes[j],
-            color = \
-                (color_dict[kw['colors'][i]] \
-                if kw['colors'][i] in color_dict.keys() \
-                else kw['colors'][i]) \
-                if kw['colors'] != defaults['colors'] \
-                else defaults['colors'][j],
-            marker = kw['markers'][i] if kw['markers'] \
-                != defaults['markers'] else defaults['markers'][j],
-            linestyle = kw['linestyles'][i] if kw['linestyles'] \
-                != defaults['linestyles'] else defaults['linestyles'][j],
-            label = r'{}'.format(
-                (kw['labels'][i] if (
-                    type(kw['labels']) == list \
-                    and len(kw['labels']) == 3 \
-                    and kw['split'] == True) \
-                else kw['labels']) if kw['labels'] \
-                != defaults['labels'] else defaults['labels'][j]),
-            linewidth = kw['linewidth'],
-            ecolor = kw['ecolor'],
-            elinewidth = kw['elinewidth'],
-            errorevery = kw['errorevery'],
-            barsabove = kw['barsabove'],
-            markersize = kw['markersize'],
-            fillstyle = kw['fillstyle'],
-            markevery = kw['markevery'],
-            )
-            # **kwargs, but careful not to override things
-
-        if kw['xlim']:
-            plt.xlim(kw['xlim'])
-        if kw['ylim']:
-            plt.ylim(kw['ylim'])
-
-        if type(kw['titles']) == str:
-            plt.title(r'{}'.format(kw['titles']))
-        elif type(kw['titles']) == list \
-                and type(kw['titles'][i]) == str:
-            plt.title(r'{}'.format(kw['titles'][i] \
-                if kw['titles'] != defaults['titles'] \
-                else defaults['titles'][j]))
-
-        if type(kw['axis_labels'][0]) == str:
-            plt.xlabel(r'{}'.format(kw['axis_labels'][0]))
-        if type(kw['axis_labels'][1]) == str:
-            plt.ylabel(r'{}'.format(kw['axis_labels'][1]))
-
-        if type(kw['legend']) == str:
-            plt.legend(loc = kw['legend'])
-        elif kw['legend'] == True:
-            plt.legend(loc = 'best')
-
-        if type(kw['save']) == str or kw['save'] == True:
-            # this works bad, redo
-            if kw['split'] == False and type(kw['save']) == str:
-                plt.savefig(kw['save'] + '{}'.format(
-                    '.pdf' if '.' not in kw['save'] else ''))
-
-            elif kw['split'] == False and kw['save'] == True:
-                plt.savefig('figure.pdf')
+        with timings.stage('artists'):
+            _draw_graph(plt.gca(), i, j, series, kw, defaults)
 
-            else:
-                if type(kw['save']) == str:
-                    if '.' in kw['save']:
-                        wf = re.search(r'\.', kw['save']).start()
-                        # wf, like where_format, where the . is in the savename
-                        plt.savefig(
-                            kw['save'][:wf] + fignames[i] + kw['save'][wf:])
-                    else:
-                        plt.savefig(kw['save'] + fignames[i] + '.pdf')
-
-                elif type(kw['save']) == list \
-                    and len(kw['save']) == len(graphs):
-                    plt.savefig('{}{{}}'.format(kw['save'][i])).format(
-                        '.pdf' if '.' not in kw['save'][i] else '')
-
-                else:
-                    if i == 0:
-                        plt.savefig('data_scatter.pdf')
-                    elif i == 1:
-                        plt.savefig('fit_curve.pdf')
-                    elif i == 2:
-                        plt.savefig('fit_data.pdf')
+        if usetex:
+            with timings.stage('tex'):
+                _warm_tex_cache(_axes_texts(plt.gca()))
+
+        figname = _figure_name(kw['save'], kw['split'], i, graphs)
+        if figname is not None:
+            with timings.stage('save'):
+                plt.savefig(figname)
+
+        figure_timings.append(timings)
+        timings = _Timings()
 
     plt.show()
-    return
\ No newline at end of file
+    return figure_timings
@@ -0,0 +1,129 @@
+import zipfile
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+__all__ = ['_read_binary', '_require']
+
+
+_local_header_size = 30 # fixed part of a zip local file header
+_header_readers = {
+    (1, 0): np.lib.format.read_array_header_1_0,
+    (2, 0): np.lib.format.read_array_header_2_0,
+}
+
+
+
+def _require(*modules, what):
+    """
+    Raises an ImportError naming the optional packages needed for `what`
+    unless one of them is installed.
+    """
+    if not any(importlib.util.find_spec(module) for module in modules):
+        raise ImportError(f"{what} needs {' or '.join(modules)}"
+            f" (pip install {modules[0]})")
+
+
+
+def _npy_version(archive, info):
+    with archive.open(info) as member:
+        return np.lib.format.read_magic(member)
+
+
+
+def _npz_member(file, archive, info):
+    """
+    A member of an `.npz` file: mapped into memory if it is stored without
+    compression (as `np.savez` does) and read otherwise.
+    """
+    read_header = _header_readers.get(_npy_version(archive, info))
+    if info.compress_type != zipfile.ZIP_STORED or read_header is None:
+        with archive.open(info) as member:
+            return np.lib.format.read_array(member, allow_pickle = False)
+
+    # the data of a stored member starts after its local header
+    file.seek(info.header_offset)
+    header = file.read(_local_header_size)
+    name_length = int.from_bytes(header[26:28], 'little')
+    extra_length = int.from_bytes(header[28:30], 'little')
+    file.seek(info.header_offset + _local_header_size + name_length \
+        + extra_length)
+
+    np.lib.format.read_magic(file)
+    shape, fortran, dtype = read_header(file)
+    if dtype.hasobject:
+        raise ValueError("npz members with python objects can not be read")
+    return np.memmap(file.name, dtype = dtype, mode = 'r',
+        offset = file.tell(), shape = shape,
+        order = 'F' if fortran else 'C')
+
+
+
+def _read_npz(filename, columns):
+    """
+    Columns of an `.npz` file with one (1D) array per column.
+    """
+    data = {}
+    with open(filename, 'rb') as file, zipfile.ZipFile(file) as archive:
+        for info in archive.infolist():
+            name = info.filename[:-len('.npy')] \
+                if info.filename.endswith('.npy') else info.filename
+            if columns is None or name in columns:
+                data[name] = _npz_member(file, archive, info)
+
+    if columns is not None:
+        missing = [column for column in columns if column not in data]
+        if missing:
+            raise KeyError(f"columns {missing} are not in {filename}")
+        data = {column: data[column] for column in columns}
+    return pd.DataFrame(data, copy = False)
+
+
+
+def _read_binary(filename, kind, kw):
+    """
+    Reads a columnar binary file (Parquet, Feather, NPZ or HDF5) into a
+    DataFrame. Only the columns in `cols` are read (if they're names), and
+    uncompressed Feather and NPZ files are mapped into memory instead of
+    read. Numeric Feather columns without missing values stay views of the
+    map, the others (and compressed files) are copied into the frame.
+    Returns the frame and a dict with the engine.
+    """
+    cols = kw['cols']
+    names = list(cols) if cols is not None and np.ndim(cols) == 1 \
+        and all(isinstance(col, str) for col in cols) else None
+
+    if kind == 'parquet':
+        _require('pyarrow', 'fastparquet', what = "reading Parquet files")
+        data = pd.read_parquet(filename, columns = names)
+        engine = 'parquet'
+
+    elif kind == 'feather':
+        _require('pyarrow', what = "reading Feather files")
+        import pyarrow.feather
+        # one block per column, so that pandas doesn't copy them together,
+        # and arrow buffers freed as they're converted
+        data = pyarrow.feather.read_table(filename, columns = names,
+            memory_map = True).to_pandas(split_blocks = True,
+            self_destruct = True)
+        engine = 'feather'
+
+    elif kind == 'npz':
+        data = _read_npz(filename, names)
+        engine = 'npz'
+
+    else:
+        _require('tables', what = "reading HDF5 files")
+        data = pd.read_hdf(filename, key = kw['key'], columns = names)
+        engine = 'hdf5'
+
+    if cols is not None and names is None:
+        # positions (or the last one), selected once read
+        positions = list(range(int(cols) + 1)) if np.ndim(cols) == 0 \
+            else list(cols)
+        data = data.iloc[:, positions]
+    if kw['nrows'] is not None:
+        data = data.iloc[:kw['nrows']]
+
+    return data, dict(engine = engine)
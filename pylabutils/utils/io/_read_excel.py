@@ -0,0 +1,179 @@
+import re
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+__all__ = ['_read_excel', '_sheet_names', '_excel_ints']
+
+
+
+def _openpyxl():
+    """
+    Imports openpyxl when it is needed, so that only reading Excel files
+    requires it.
+    """
+    try:
+        import openpyxl
+        import openpyxl.utils
+    except ImportError:
+        raise ImportError("reading .xlsx files needs the openpyxl package"
+            " (pip install openpyxl)") from None
+    return openpyxl
+
+
+
+def _letters(cols):
+    """
+    0-indexed columns of Excel ranges like `'A:E'` or `'A,C,E:F'`.
+    """
+    indices = []
+    for part in cols.replace(' ', '').split(','):
+        if not re.fullmatch(r'[A-Za-z]+(:[A-Za-z]+)?', part):
+            raise ValueError(f"invalid Excel column range {part!r}")
+        ends = [_openpyxl().utils.column_index_from_string(end.upper()) - 1 \
+            for end in part.split(':')]
+        indices += range(ends[0], ends[-1] + 1)
+    return sorted(set(indices))
+
+
+
+def _positions(cols):
+    """
+    0-indexed columns selected by `cols` (`None` for all of them, or a list
+    of names, which needs the header).
+    """
+    if cols is None:
+        return None
+    if isinstance(cols, str):
+        return _letters(cols)
+    if np.ndim(cols) == 0:
+        return list(range(int(cols) + 1)) # the last column to read
+    if all(isinstance(col, str) for col in cols):
+        return list(cols)
+    return sorted(int(col) for col in cols)
+
+
+
+def _worksheet(workbook, sheet):
+    if isinstance(sheet, str):
+        return workbook[sheet]
+    return workbook.worksheets[sheet]
+
+
+
+def _sheet_names(filename, sheet_name):
+    """
+    Sheets requested by `sheet_name` (`None` for all of them, or a list),
+    as given, or by name when all of them are requested.
+    """
+    if sheet_name is not None:
+        return list(sheet_name)
+    workbook = _openpyxl().load_workbook(filename, read_only = True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+
+def _read_excel(filename, kw):
+    """
+    Reads one sheet of an `.xlsx` file, streaming its rows in read-only mode
+    and only keeping the values of the requested rows and columns (`cols`,
+    `nrows`, `skiprows`, `skipfooter`).
+    """
+    header = 0 if kw['header'] == 'auto' else kw['header']
+    skiprows = kw['skiprows']
+    skip = set(range(skiprows)) if isinstance(skiprows, int) \
+        else set(skiprows or [])
+    positions = _positions(kw['cols'])
+
+    # rows and columns that are never needed are not even streamed
+    bounds = {}
+    if positions and not isinstance(positions[0], str):
+        bounds.update(min_col = positions[0] + 1, max_col = positions[-1] + 1)
+        offsets = [position - positions[0] for position in positions]
+    else:
+        offsets = None
+    if kw['nrows'] is not None and not kw['skipfooter']:
+        bounds['max_row'] = kw['nrows'] + len(skip) \
+            + (0 if header is None else header + 1)
+
+    workbook = _openpyxl().load_workbook(filename, read_only = True,
+        data_only = True)
+    try:
+        sheet = _worksheet(workbook, kw['sheet_name'])
+        picker = None if offsets is None else itemgetter(*offsets)
+
+        names, rows = None, []
+        kept = 0
+        for i, row in enumerate(sheet.iter_rows(values_only = True,
+                **bounds)):
+            if i in skip:
+                continue
+            if picker is not None:
+                row = picker(row) if len(offsets) > 1 else (picker(row),)
+            if header is not None and kept <= header:
+                if kept == header:
+                    names = row
+                kept += 1
+                continue
+            rows.append(row)
+            if kw['nrows'] is not None and not kw['skipfooter'] \
+                    and len(rows) == kw['nrows']:
+                break
+    finally:
+        workbook.close()
+
+    if kw['skipfooter']:
+        rows = rows[:len(rows) - kw['skipfooter']]
+    if kw['nrows'] is not None:
+        rows = rows[:kw['nrows']]
+
+    ncols = max([len(names or ())] + [len(row) for row in rows])
+    if names is None:
+        names = list(positions) if offsets is not None \
+            else list(range(ncols))
+    names = list(names) + [None] * (ncols - len(names))
+    names = [f'Unnamed: {j}' if name is None else name \
+        for j, name in enumerate(names)]
+
+    if any(len(row) < ncols for row in rows):
+        rows = [row + (None,) * (ncols - len(row)) for row in rows]
+    columns = list(zip(*rows)) if rows else [()] * ncols
+    data = pd.DataFrame({j: pd.Series(column) \
+        for j, column in enumerate(columns)})
+    data.columns = names
+    if kw['dtype']:
+        data = data.astype(kw['dtype'])
+
+    if positions and isinstance(positions[0], str):
+        data = data[positions]
+
+    if kw['thousands']:
+        for name in data.columns:
+            column = data[name]
+            if not is_numeric_dtype(column):
+                data[name] = column.map(lambda value: value.replace(
+                    kw['thousands'], '') if isinstance(value, str) else value)
+
+    return _excel_ints(data, kw['ints'])
+
+
+
+def _excel_ints(data, ints):
+    """
+    Numeric columns of an Excel sheet as floats (as Excel stores them), or
+    with `ints` those with integral values (and no NaN) as int64.
+    """
+    for name in data.columns:
+        column = data[name]
+        if column.dtype.kind == 'i' and not ints:
+            data[name] = column.astype('float64')
+        elif column.dtype.kind == 'f' and ints and len(column) \
+                and column.notna().all() \
+                and np.array_equal(column, np.round(column)):
+            data[name] = column.astype('int64')
+    return data
@@ -0,0 +1,230 @@
+import io
+import os
+import collections
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+from ._sniff import _sniff
+from ._compression import _open_binary
+
+__all__ = ['_read_text', '_read_text_chunks', '_read_horizontal',
+    '_text_engine']
+
+
+_has_pyarrow = importlib.util.find_spec('pyarrow') is not None
+_pyarrow_min_size = 8 * 2**20 # below this, starting its threads costs more
+_sample_size = 64 * 2**10
+
+
+
+def _text_engine(kw, sniffed, size):
+    """
+    Picks the pandas parser for a text file: 'pyarrow' for large files when
+    it is installed and no option needs another engine, 'python' only when
+    an option needs it (`skipfooter`, regex delimiters), 'c' otherwise. An
+    engine given in the options is kept.
+    """
+    if kw['engine'] != 'auto':
+        return kw['engine']
+
+    delim = sniffed['delim']
+    if kw['skipfooter'] or (len(delim) > 1 and delim != r'\s+'):
+        return 'python'
+
+    if _has_pyarrow and size >= _pyarrow_min_size \
+            and delim != r'\s+' \
+            and sniffed['decimal'] == '.' \
+            and not kw['nrows'] \
+            and not kw['thousands'] \
+            and not kw['skipinitialspace'] \
+            and kw['line_end'] is None \
+            and (kw['skiprows'] is None or isinstance(kw['skiprows'], int)):
+        return 'pyarrow'
+
+    return 'c'
+
+
+
+def _sample(filename):
+    """
+    First bytes of a file (decompressed), which is opened apart from the one
+    that is parsed, since compressed streams can't always go back.
+    """
+    with _open_binary(filename) as handle:
+        return handle.read(_sample_size)
+
+
+
+def _read_options(filename, kw, chunked = False):
+    """
+    Options of `pandas.read_csv` for a text file, with the delimiter,
+    decimal mark and header line sniffed from its first bytes when not
+    given. Returns them and a dict with the engine and the sniffed options.
+    """
+    sample = _sample(filename)
+
+    sniffed = _sniff(sample,
+        encoding = kw['encoding'],
+        delim = kw['delim'],
+        decimal = kw['decimal'],
+        header = kw['header'],
+        skiprows = kw['skiprows'],
+        )
+    engine = _text_engine(kw, sniffed, os.path.getsize(filename))
+    if chunked and engine == 'pyarrow' and kw['engine'] == 'auto':
+        engine = 'c' # pyarrow can not read in chunks
+
+    read_kw = dict(
+        sep = sniffed['delim'],
+        header = sniffed['header'],
+        usecols = kw['cols'],
+        dtype = kw['dtype'],
+        engine = engine,
+        encoding = kw['encoding'],
+        nrows = kw['nrows'],
+        skiprows = kw['skiprows'],
+        decimal = sniffed['decimal'],
+        thousands = kw['thousands'] or None,
+        skipinitialspace = kw['skipinitialspace'],
+        )
+    if engine == 'c':
+        read_kw['lineterminator'] = kw['line_end']
+    if kw['skipfooter']:
+        read_kw['skipfooter'] = kw['skipfooter']
+    if engine == 'pyarrow':
+        for option in ['nrows', 'thousands', 'skipinitialspace']:
+            read_kw.pop(option)
+
+    sniffed['engine'] = engine
+    return read_kw, sniffed
+
+
+
+def _read_text(filename, kw):
+    """
+    Reads a delimited text file into a DataFrame. The file is handed to the
+    parser as a binary handle (decompressing as it is read, if it must), so
+    decoding happens inside the (C or pyarrow) parser. Returns the frame and
+    a dict with the engine and the sniffed options.
+    """
+    read_kw, sniffed = _read_options(filename, kw)
+    with _open_binary(filename) as handle:
+        try:
+            file_data = pd.read_csv(handle, **read_kw)
+
+        except ValueError as e:
+            if "Unable to convert" in str(e):
+                print("Invalid value encountered in file. Check if there"
+                      " are any inf, NaN, or similars in your data."
+                      " Columns longer than others can also be a problem.")
+            raise e
+
+    return file_data, sniffed
+
+
+
+def _read_text_chunks(filename, kw):
+    """
+    Same as `_read_text`, but yields the frame in chunks of `chunksize`
+    rows, keeping the file open in between.
+    """
+    read_kw, sniffed = _read_options(filename, kw, chunked = True)
+    with _open_binary(filename) as handle:
+        with pd.read_csv(handle, chunksize = kw['chunksize'],
+                **read_kw) as reader:
+            for chunk in reader:
+                yield chunk, sniffed
+
+
+
+def _row_values(fields):
+    """
+    Numeric values of the fields of a row, parsed straight into a float
+    array, or coerced one by one (as NaN) if some of them aren't numbers.
+    """
+    text = ' '.join(fields)
+    if text.strip():
+        try:
+            values = np.fromstring(text, sep = ' ')
+        except ValueError: # some field isn't a number
+            values = ()
+        if len(values) == len(fields):
+            return values
+    return pd.to_numeric(pd.Series(fields, dtype = object).str.strip() \
+        .replace('', np.nan), errors = 'coerce').to_numpy(dtype = float)
+
+
+
+def _horizontal_row(line, delim, decimal, thousands):
+    """
+    Name and values of a row of a horizontal file.
+    """
+    if thousands:
+        line = line.replace(thousands, '')
+    fields = line.split() if delim == r'\s+' else line.split(delim)
+    name = fields[0].strip()
+
+    fields = fields[1:]
+    while fields and not fields[-1].strip():
+        fields.pop() # trailing delimiters
+    if decimal != '.':
+        fields = [field.replace(decimal, '.') for field in fields]
+    return name, _row_values(fields)
+
+
+
+def _read_horizontal(filename, kw):
+    """
+    Reads a text file with a variable per row (its name first) straight into
+    a float array per variable, without transposing a frame. The file is
+    streamed, each row parsed as soon as it is read (only the last
+    `skipfooter` rows wait, until it is known they're not the footer). Rows
+    shorter than the longest one are padded with NaN. Returns the frame and
+    the sniffed options.
+    """
+    sniffed = _sniff(_sample(filename),
+        encoding = kw['encoding'],
+        delim = kw['delim'],
+        decimal = kw['decimal'],
+        header = 0,
+        skiprows = kw['skiprows'],
+        )
+    delim, decimal = sniffed['delim'], sniffed['decimal']
+
+    skiprows = kw['skiprows']
+    skip = set(range(skiprows)) if isinstance(skiprows, int) \
+        else set(skiprows or [])
+
+    columns = {}
+    pending = collections.deque()
+    with io.TextIOWrapper(_open_binary(filename),
+            encoding = kw['encoding']) as file:
+        for i, line in enumerate(file):
+            if kw['nrows'] is not None and len(columns) >= kw['nrows']:
+                break
+            line = line.rstrip('\r\n')
+            if i in skip or not line.strip():
+                continue
+            if not pending and not columns:
+                line = line.lstrip('\ufeff')
+            pending.append(line)
+            if len(pending) <= (kw['skipfooter'] or 0):
+                continue
+
+            name, values = _horizontal_row(pending.popleft(), delim, decimal,
+                kw['thousands'])
+            if name in columns:
+                raise ValueError(f"variable {name!r} is in more than one row")
+            columns[name] = values
+
+    length = max((len(values) for values in columns.values()), default = 0)
+    for name, values in columns.items():
+        if len(values) < length:
+            padded = np.full(length, np.nan)
+            padded[:len(values)] = values
+            columns[name] = padded
+
+    sniffed.update(header = None, engine = 'horizontal')
+    return pd.DataFrame(columns, copy = False), sniffed
@@ -0,0 +1,121 @@
+import numpy as np
+
+__all__ = ['_adaptive_sample', '_sample_curve']
+
+
+
+def _scale_funcs(scale):
+    """
+    Forward and inverse transforms of a 'linear' or 'log' axis scale.
+    """
+    if scale == 'linear':
+        return (lambda v: v), (lambda v: v)
+    elif scale == 'log':
+        def _log(v):
+            v = np.asarray(v, dtype = float)
+            with np.errstate(divide = 'ignore', invalid = 'ignore'):
+                return np.where(v > 0, np.log10(np.abs(v)), np.nan)
+        return _log, (lambda v: 10.**v)
+    raise ValueError(f"{scale!r} is not a valid axis scale")
+
+
+
+def _adaptive_sample(func, a, b, xscale = 'linear', yscale = 'linear',
+        ylim = None, n0 = 33, tol = 1e-3, max_points = 5000, max_depth = 16):
+    """
+    Samples `func` over `[a, b]` refining only where the curve is poorly
+    drawn by straight segments. Every round evaluates the midpoints of the
+    pending intervals in one vectorized call and splits those whose
+    midpoint is more than `tol` (as a fraction of the height of the axes,
+    in the scale they are drawn in) away from the segment. Returns the
+    sorted `(x, y)` samples.
+    """
+    xfwd, xinv = _scale_funcs(xscale)
+    yfwd, _ = _scale_funcs(yscale)
+
+    def _eval(u):
+        x = xinv(u)
+        return np.broadcast_to(np.asarray(func(x), dtype = float), x.shape)
+
+    u = np.linspace(xfwd(a), xfwd(b), n0)
+    y = _eval(u)
+    ty = yfwd(y)
+
+    def _span(ty, bounds):
+        # vertical screen scale: the limits if given, the samples so far if
+        # not (it grows as refining uncovers peaks)
+        if ylim:
+            span = np.abs(np.diff(yfwd(np.asarray(ylim, dtype = float))))[0]
+            return (span if np.isfinite(span) and span > 0 else 1.), bounds
+        finite = ty[np.isfinite(ty)]
+        if finite.size:
+            bounds = (min(bounds[0], finite.min()),
+                max(bounds[1], finite.max()))
+        span = bounds[1] - bounds[0]
+        return (span if np.isfinite(span) and span > 0 else 1.), bounds
+
+    y_span, y_bounds = _span(ty, (np.inf, -np.inf))
+
+    us, ys = [u], [y]
+    npoints = len(u)
+    # pending intervals, as their ends and the transformed values there
+    left, right = u[:-1], u[1:]
+    tleft, tright = ty[:-1], ty[1:]
+
+    for _ in range(max_depth):
+        if not len(left) or npoints >= max_points:
+            break
+
+        mid = (left + right) / 2
+        ymid = _eval(mid)
+        tmid = yfwd(ymid)
+        y_span, y_bounds = _span(tmid, y_bounds)
+        us.append(mid)
+        ys.append(ymid)
+        npoints += len(mid)
+
+        with np.errstate(invalid = 'ignore'):
+            error = np.abs(tmid - (tleft + tright) / 2) / y_span
+        # where the curve appears or disappears (poles, log of <= 0...)
+        finite = np.isfinite(tmid)
+        error[finite != (np.isfinite(tleft) & np.isfinite(tright))] = np.inf
+        error[~finite & ~np.isfinite(tleft) & ~np.isfinite(tright)] = 0.
+        error = np.nan_to_num(error, nan = np.inf)
+
+        bad = np.flatnonzero(error > tol)
+        budget = (max_points - npoints) // 2
+        if len(bad) > budget:
+            bad = bad[np.argsort(error[bad])[::-1][:max(budget, 0)]]
+
+        left = np.concatenate([left[bad], mid[bad]])
+        right = np.concatenate([mid[bad], right[bad]])
+        tleft = np.concatenate([tleft[bad], tmid[bad]])
+        tright = np.concatenate([tmid[bad], tright[bad]])
+
+    u, y = np.concatenate(us), np.concatenate(ys)
+    order = np.argsort(u, kind = 'stable')
+    return xinv(u[order]), y[order]
+
+
+
+def _sample_curve(func, a, b, kw):
+    """
+    Points of the dense fit curve over `[a, b]` according to the `sampling`,
+    `xscale` and `yscale` options.
+    """
+    if kw['sampling'] == 'adaptive':
+        return _adaptive_sample(func, a, b,
+            xscale = kw['xscale'],
+            yscale = kw['yscale'],
+            ylim = kw['ylim'],
+            tol = kw['sampling_tol'],
+            max_points = kw['sampling_max'],
+            )
+    elif kw['sampling'] != 'linspace':
+        raise ValueError(f"{kw['sampling']!r} is not a valid sampling method")
+
+    if kw['xscale'] == 'log' and a > 0:
+        xvals = np.geomspace(a, b, kw['linspace_vals'])
+    else:
+        xvals = np.linspace(a, b, kw['linspace_vals'])
+    return xvals, func(xvals)
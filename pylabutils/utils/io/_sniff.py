@@ -0,0 +1,110 @@
+import re
+
+__all__ = ['_sniff']
+
+
+_delims = ['\t', ';', ',', '|', r'\s+'] # in order of preference
+_number_re = re.compile(
+    r'^[-+]?(?:\d+(?:[.,]\d*)?|[.,]\d+)(?:[eE][-+]?\d+)?$|^[-+]?(?:nan|inf)$',
+    re.IGNORECASE)
+
+
+
+def _split(line, delim):
+    if delim == r'\s+':
+        return line.split()
+    return line.split(delim)
+
+
+
+def _sample_lines(sample, encoding, skiprows = None, nlines = 50):
+    """
+    First lines of a sample of the file (bytes), without the last one (most
+    likely cut) unless the sample is the whole file.
+    """
+    text = sample.decode(encoding or 'utf-8', errors = 'replace')
+    lines = text.splitlines()
+    if len(lines) > 1 and not text.endswith(('\n', '\r')):
+        lines = lines[:-1]
+
+    if isinstance(skiprows, int):
+        lines = lines[skiprows:]
+    elif skiprows is not None and not callable(skiprows):
+        skip = set(skiprows)
+        lines = [line for i, line in enumerate(lines) if i not in skip]
+
+    return [line.lstrip('\ufeff') for line in lines if line.strip()][:nlines]
+
+
+
+def _consistency(lines, delim):
+    """
+    Fraction of lines with the most common amount of fields (if there is
+    more than one field) and that amount.
+    """
+    counts = [len(_split(line.strip() if delim == r'\s+' else line, delim)) \
+        for line in lines]
+    mode = max(set(counts), key = counts.count)
+    if mode < 2:
+        return 0., mode
+    return counts.count(mode) / len(counts), mode
+
+
+
+def _is_number(token):
+    return bool(_number_re.match(token.strip()))
+
+
+
+def _sniff(sample, encoding = 'utf-8', delim = None, decimal = None,
+        header = 'auto', skiprows = None):
+    """
+    Guesses the delimiter, the decimal mark and whether there is a header
+    line from a sample (bytes) of the beginning of a text file. Options
+    that are given are kept as they are. Returns a dict with the keys
+    `delim`, `decimal` and `header` (0 or None).
+    """
+    lines = _sample_lines(sample, encoding, skiprows = skiprows)
+    found = dict(delim = delim, decimal = decimal, header = header)
+    if not lines:
+        found.update(delim = delim or ',', decimal = decimal or '.',
+            header = 0 if header == 'auto' else header)
+        return found
+
+    if delim is None:
+        # data lines are the best judges, the header may have spaces in it
+        body = lines[1:] or lines
+        scores = {candidate: _consistency(body, candidate) \
+            for candidate in _delims}
+        best = max(_delims, key = lambda candidate: scores[candidate][0])
+        if scores[best][0] == 0.:
+            best = ','
+
+        if best == ',' and scores[r'\s+'][0] == scores[','][0] \
+                and any(re.search(r'\d\s+[-+]?\d', field.strip()) \
+                for line in body for field in line.split(',')):
+            best = r'\s+' # commas are decimal marks between whitespace
+        found['delim'] = best
+
+    tokens = [token.strip() for line in lines[1:] or lines \
+        for token in _split(line, found['delim'])]
+
+    if decimal is None:
+        comma = any(re.match(r'^[-+]?\d*,\d+(?:[eE][-+]?\d+)?$', token) \
+            for token in tokens)
+        point = any(re.match(r'^[-+]?\d*\.\d+(?:[eE][-+]?\d+)?$', token) \
+            for token in tokens)
+        found['decimal'] = ',' if comma and not point \
+            and found['delim'] != ',' else '.'
+
+    if header == 'auto':
+        first = [token for token in _split(lines[0].strip() \
+            if found['delim'] == r'\s+' else lines[0], found['delim']) \
+            if token.strip()]
+        numeric_first = all(_is_number(token) for token in first)
+        numeric_body = sum(_is_number(token) for token in tokens) \
+            > len(tokens) / 2 if tokens else False
+        found['header'] = None if numeric_first and numeric_body \
+            and len(lines) > 1 else 0
+
+    return found
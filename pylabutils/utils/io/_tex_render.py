@@ -0,0 +1,110 @@
+import re
+import time
+from pathlib import Path
+from contextlib import contextmanager
+
+from matplotlib.mathtext import MathTextParser
+from matplotlib.texmanager import TexManager
+
+__all__ = ['_set_tex_cache', '_needs_tex', '_resolve_usetex',
+    '_axes_texts', '_warm_tex_cache', '_Timings']
+
+
+
+def _set_tex_cache(path):
+    """
+    Points matplotlib's cache of TeX output to `path`. Matplotlib already
+    stores every rendered TeX fragment under a hash of its source, writing
+    each file atomically, so a directory shared by several processes (or
+    machines) lets them all reuse each other's LaTeX runs.
+    """
+    path = Path(path).expanduser()
+    path.mkdir(parents = True, exist_ok = True)
+    if hasattr(TexManager, '_cache_dir'):
+        TexManager._cache_dir = path
+    else: # older matplotlib versions
+        TexManager.texcache = str(path)
+    return path
+
+
+_mathtext_parser = MathTextParser('path')
+
+def _needs_tex(text):
+    """
+    Checks whether a string needs the TeX engine, i.e. whether it has
+    commands outside of math mode or math that mathtext cannot parse.
+    """
+    if type(text) != str or not text:
+        return False
+
+    segments = re.split(r'(?<!\\)\$', text)
+    if len(segments) % 2 == 0:
+        return False # unbalanced $ is plain text to mathtext, but not to TeX
+
+    for k, segment in enumerate(segments):
+        if k % 2 == 0:
+            # text mode: any command other than an escaped character
+            if re.search(r'\\[A-Za-z]', segment):
+                return True
+        elif segment:
+            try:
+                _mathtext_parser.parse(f'${segment}$')
+            except Exception:
+                return True
+    return False
+
+
+
+def _resolve_usetex(usetex, texts):
+    """
+    Resolves `usetex = 'auto'`: TeX is used only if some of the texts need
+    it, otherwise matplotlib's mathtext renders them.
+    """
+    if type(usetex) == str and usetex.lower() == 'auto':
+        return any(_needs_tex(text) for text in texts)
+    return bool(usetex)
+
+
+
+def _axes_texts(ax):
+    """
+    Returns the `(text, fontsize)` pairs of the title, axis labels and legend
+    of a `matplotlib.axes.Axes`.
+    """
+    artists = [ax.title, ax.xaxis.label, ax.yaxis.label]
+    legend = ax.get_legend()
+    if legend is not None:
+        artists += legend.get_texts()
+    return [(artist.get_text(), artist.get_fontsize()) for artist in artists]
+
+
+
+def _warm_tex_cache(texts):
+    """
+    Runs TeX on every distinct `(text, fontsize)` pair that is not cached
+    yet, so that the time spent on LaTeX can be told apart from the rest of
+    the drawing. Returns the amount of fragments processed.
+    """
+    texmanager = TexManager()
+    done = set()
+    for text, fontsize in texts:
+        if not text or (text, fontsize) in done:
+            continue
+        texmanager.make_dvi(text, fontsize)
+        done.add((text, fontsize))
+    return len(done)
+
+
+
+class _Timings(dict):
+    """
+    Wall time spent in each stage of drawing a figure, in seconds.
+    """
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self[name] = self.get(name, 0.) + time.perf_counter() - start
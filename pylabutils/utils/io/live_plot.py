@@ -0,0 +1,253 @@
+import numpy as np
+import matplotlib.pyplot as plt
+
+from ..._tools._colors import color_dict
+from ..._tools._compile_func import _compile_func
+
+
+__all__ = ['LivePlot']
+
+
+
+class LivePlot:
+    """
+    A fit graph (data with error bars plus the fit curve) that is updated in
+    place, for monitoring fits that are repeated every few seconds. The
+    figure and its artists are created once; every `update` only changes
+    their data and, where the backend supports it, redraws them by blitting
+    over a saved background, so the cost of a refresh does not grow over a
+    session.
+
+    Usage example:
+
+    `>>> plot = LivePlot(result, xdata, ydata, yerr = yerr)`
+
+    `>>> while acquiring:`
+
+    `...     plot.update(fit(func, xdata, ydata, ...), xdata, ydata)`
+
+
+    \> Parameters:
+
+    `result` : *FitResult*
+
+    The result of `fit` to draw the curve of.
+
+
+    `xdata`, `ydata` : *array-like*
+
+    Data to draw.
+
+
+    `yerr`, `xerr` : *array-like or None; optional*
+
+    Errors of the data. Whether each of them is drawn is fixed on creation.
+
+    default : `None`
+
+
+    `ax` : *matplotlib.axes.Axes or None; optional*
+
+    Axes to draw on. If `None`, a new pyplot figure is created and shown
+    without blocking.
+
+    default : `None`
+
+
+    `blit` : *bool; optional*
+
+    Chooses whether to use blitting when the backend supports it.
+
+    default : `True`
+
+
+    `autoscale` : *bool; optional*
+
+    Chooses whether to rescale the axes when the data leaves them (which
+    requires a full redraw).
+
+    default : `True`
+
+
+    \> Other options:
+
+    size, colors (2 x str), capsize, markers (2 x str), labels (2 x str),
+    axis_labels (2 x str), title, legend, linspace_vals, show.
+
+    """
+
+    def __init__(self, result, xdata, ydata, yerr = None, xerr = None,
+            ax = None, **options):
+
+        kw = dict(
+            blit = True,
+            autoscale = True,
+            size = (6, 4),
+            colors = ['blue', 'red'],
+            capsize = 3,
+            markers = ['.', ''],
+            labels = [None, None],
+            axis_labels = [None, None],
+            title = None,
+            legend = False,
+            linspace_vals = 400,
+            show = True,
+        )
+
+        kw.update(options)
+        self.options = kw
+
+        created = ax is None
+        if created:
+            self.figure = plt.figure(figsize = kw['size'])
+            ax = self.figure.gca()
+        else:
+            self.figure = ax.figure
+        self.ax = ax
+        self.canvas = self.figure.canvas
+
+        colors = [color_dict.get(color, color) for color in kw['colors']]
+
+        xdata, ydata = np.asarray(xdata), np.asarray(ydata)
+        self._has_err = (xerr is not None, yerr is not None)
+        self._data = ax.errorbar(xdata, ydata, yerr = yerr, xerr = xerr,
+            capsize = kw['capsize'], color = colors[0],
+            marker = kw['markers'][0], linestyle = '',
+            label = kw['labels'][0])
+
+        self._func = None
+        self._func_image = None
+        xvals, yvals = self._curve_values(result, xdata)
+        self._curve, = ax.plot(xvals, yvals, color = colors[1],
+            marker = kw['markers'][1], label = kw['labels'][1])
+
+        if type(kw['axis_labels'][0]) == str:
+            ax.set_xlabel(r'{}'.format(kw['axis_labels'][0]))
+        if type(kw['axis_labels'][1]) == str:
+            ax.set_ylabel(r'{}'.format(kw['axis_labels'][1]))
+        if type(kw['title']) == str:
+            ax.set_title(r'{}'.format(kw['title']))
+        if type(kw['legend']) == str:
+            ax.legend(loc = kw['legend'])
+        elif kw['legend'] == True:
+            ax.legend(loc = 'best')
+
+        self._blit = kw['blit'] and getattr(self.canvas, 'supports_blit',
+            False)
+        self._background = None
+        self._draw_cid = None
+        if self._blit:
+            for artist in self._artists():
+                artist.set_animated(True)
+            self._draw_cid = self.canvas.mpl_connect('draw_event',
+                self._on_draw)
+
+        if kw['show'] and created:
+            plt.show(block = False)
+        self.canvas.draw()
+
+
+    def _artists(self):
+        data_line, caplines, barlinecols = self._data.lines
+        return [data_line, *caplines, *barlinecols, self._curve]
+
+
+    def _curve_values(self, result, xdata):
+        """
+        Dense fit curve over the range of the data, evaluated with the
+        function the fit compiled (with its scope). Results without it get
+        the function compiled here, only again if it changes between
+        updates.
+        """
+        if result.func_image is not None:
+            self._func, self._func_image = result.func, result.func_image
+        elif result.func != self._func:
+            self._func = result.func
+            self._func_image = _compile_func(result.func, result.parms)
+
+        xvals = np.linspace(float(np.min(xdata)), float(np.max(xdata)),
+            self.options['linspace_vals'])
+        return xvals, self._func_image(xvals, *result.values)
+
+
+    def _on_draw(self, event):
+        # full redraws (resizes, rescales...) refresh the saved background
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_animated()
+
+
+    def _draw_animated(self):
+        for artist in self._artists():
+            self.ax.draw_artist(artist)
+
+
+    def _set_errorbars(self, xdata, ydata, yerr, xerr):
+        data_line, caplines, barlinecols = self._data.lines
+        data_line.set_data(xdata, ydata)
+
+        # matplotlib adds the x error bars before the y ones, and the lower
+        # caps before the upper ones
+        caplines, barlinecols = list(caplines), list(barlinecols)
+        for has_err, err, axis in zip(self._has_err, [xerr, yerr], 'xy'):
+            if not has_err:
+                continue
+            if err is None:
+                err = 0.
+            err = np.broadcast_to(np.asarray(err, dtype = float),
+                (2, len(xdata)) if np.ndim(err) == 2 else (len(xdata),))
+            low, high = (err[0], err[1]) if err.ndim == 2 else (err, err)
+
+            if axis == 'x':
+                ends = [(xdata - low, ydata), (xdata + high, ydata)]
+            else:
+                ends = [(xdata, ydata - low), (xdata, ydata + high)]
+
+            barlinecols.pop(0).set_segments(np.stack(
+                [np.column_stack(ends[0]), np.column_stack(ends[1])],
+                axis = 1))
+            if caplines:
+                for end in ends:
+                    caplines.pop(0).set_data(*end)
+
+
+    def update(self, result, xdata, ydata, yerr = None, xerr = None):
+        """
+        Replaces the data and the fit curve with new ones, mutating the
+        existing artists.
+        """
+        xdata, ydata = np.asarray(xdata), np.asarray(ydata)
+        self._set_errorbars(xdata, ydata, yerr, xerr)
+        self._curve.set_data(*self._curve_values(result, xdata))
+
+        rescale = False
+        if self.options['autoscale']:
+            (x0, x1), (y0, y1) = self.ax.get_xlim(), self.ax.get_ylim()
+            rescale = bool(np.min(xdata) < min(x0, x1) \
+                or np.max(xdata) > max(x0, x1) \
+                or np.min(ydata) < min(y0, y1) \
+                or np.max(ydata) > max(y0, y1))
+
+        if rescale:
+            self.ax.relim()
+            self.ax.autoscale_view()
+
+        if self._blit and self._background is not None and not rescale:
+            self.canvas.restore_region(self._background)
+            self._draw_animated()
+            self.canvas.blit(self.figure.bbox)
+        elif self._blit:
+            self.canvas.draw() # draw_event saves the new background
+            self.canvas.blit(self.figure.bbox)
+        else:
+            self.canvas.draw_idle()
+        self.canvas.flush_events()
+
+
+    def close(self):
+        """
+        Disconnects the plot from its canvas and closes its figure.
+        """
+        if self._draw_cid is not None:
+            self.canvas.mpl_disconnect(self._draw_cid)
+            self._draw_cid = None
+        plt.close(self.figure)
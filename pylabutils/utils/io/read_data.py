@@ -1,10 +1,19 @@
-import copy
-import codecs
+import os
+import glob
 import warnings
+import concurrent.futures as cf
 
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_numeric_dtype
 
 from ..._tools._add_cols import _add_cols
+from ..._tools._derive import _derive
+from ._read_text import _read_text, _read_text_chunks, _read_horizontal
+from ._read_excel import _read_excel, _sheet_names, _excel_ints
+from ._cache import _read_cache, _file_key
+from ._compression import _file_kind
+from ._read_binary import _read_binary
 
 __all__ = ['read_data']
 
@@ -18,9 +27,23 @@ def read_data(filename, scope = (globals(), locals()), **options):
 
     \> Parameters:
 
-    `filename` : *str*
+    `filename` : *str, glob pattern or list of str*
 
     Name of the file data is to be extracted from in the current directory.
+    Text files can be compressed (`.gz`, `.bz2`, `.xz` or, with the
+    zstandard package, `.zst`, e.g. `'run.csv.gz'`): they are decompressed
+    as they are parsed, also in chunks.
+
+    Columnar binary files are read as well: `.parquet` (needs pyarrow or
+    fastparquet), `.feather` (needs pyarrow), `.npz` (one array per column)
+    and `.h5` (needs PyTables), e.g. as written by `write_data`. Feather and
+    uncompressed NPZ files are mapped into memory instead of read, only the
+    columns in `cols` are loaded (when given by name), and `layout`,
+    `numeric`, `astype`, `dropna` and `downcast` work as for text files.
+    These files are not cached, they're fast to load already.
+    With a glob pattern (e.g. `'runs/*.csv'`) or a list of names, all the
+    files are read concurrently with the same options (see `threads`,
+    `combine`, `source` and `errors`).
 
 
     `scope` : *`(globals(), locals())`; optional*
@@ -35,7 +58,9 @@ def read_data(filename, scope = (globals(), locals()), **options):
 
     Specified if your data layout follows a vertical or horizontal pattern.
     If the layout is horizontal avoid having equal names for more than one row
-    or an error will be raised.
+    or an error will be raised. Numeric horizontal text files (without `cols`
+    or `dtype`) are parsed row by row straight into a float array per
+    variable, padding shorter rows with NaN.
 
     default : `'vertical'`
 
@@ -43,18 +68,42 @@ def read_data(filename, scope = (globals(), locals()), **options):
     `delim` : *`{' ', ',', ', ', '\t', ';'}`; optional*
 
     Specifies which string is to be parsed as delimiter for row values inside
-    the data. If `None`, the function calculates it by itself
+    the data. If `None`, it is sniffed from the first lines of the file
+    (tabs, semicolons, commas, bars or runs of whitespace).
 
     default : `None`
 
 
+    `header` : *'auto', int or None; optional*
+
+    Row number of the column names (for a vertical layout). With 'auto',
+    the first line is taken as the header unless it is as numeric as the
+    data below it. `None` means there is no header.
+
+    default : `'auto'`
+
+
     `mod` : *bool; optional*
 
-    Specifies whether to add more columns to the dataframe or not.
+    Specifies whether to add more columns to the dataframe or not, asking
+    for them interactively (see `derive` for scripts).
 
     default : `False`
 
 
+    `derive` : *dict or None; optional*
+
+    Columns to add (or replace), as a dict from their names to expressions
+    that reference other columns as `{col}` or by their bare names, e.g.
+    `{'P': '{V} * {I}', 'E': 'P * t'}`. Expressions can use derived columns,
+    which are computed first, and the names of `scope`; a callable is called
+    with the whole DataFrame. They're evaluated all at once with
+    `DataFrame.eval` (with numexpr, if installed) when pandas can, and as
+    compiled python otherwise. With `chunksize`, every chunk gets them.
+
+    default : `None`
+
+
     `numeric` : *bool; optional*
 
     Specifies whether the read data should be treated as numeric values.
@@ -89,9 +138,10 @@ def read_data(filename, scope = (globals(), locals()), **options):
     `decimal` : *str of length 1; optional*
 
     Specifies which character should be interpreted as a decimal point
-    delimiter.
+    delimiter. If `None`, it is sniffed from the file (',' if the numbers
+    use commas and the delimiter is not a comma).
 
-    default : `'.'`
+    default : `None`
 
 
     `thousands` : *str; optional*
@@ -103,18 +153,20 @@ def read_data(filename, scope = (globals(), locals()), **options):
 
     `encoding` : *codecs encoding; optional*
 
-    Specifies which encoding `codecs.open()` should use when reading files.
+    Specifies which encoding the parser should use when reading files.
     It is best to leave as default.
 
     default : `'utf-8'`
 
 
-    `engine` : *`{'python', 'c'}`; optional*
+    `engine` : *`{'auto', 'c', 'pyarrow', 'python'}`; optional*
 
-    Specifies which engine should be use for parsing. C is faster while Python
-    is more feature complete. It is recommended to leave Python.
+    Specifies which engine should be use for parsing. With 'auto', the C
+    parser is used (pyarrow for large files, if installed), and Python only
+    for options that need it (`skipfooter`, delimiters of several
+    characters). The engine used is stored in `data.attrs['engine']`.
 
-    default : `'python'`
+    default : `'auto'`
 
 
     `line_end` : *str of length 1; optional*
@@ -125,10 +177,12 @@ def read_data(filename, scope = (globals(), locals()), **options):
     default : `None`
 
 
-    `excel_engine` : *xlrd or None; optional*
+    `excel_engine` : *str or None; optional*
 
-    Specifies which engine should be utilized for parsing .xlsx files.
-    pandas.pydata.org/pandas-docs/version/0.23/generated/pandas.read_excel.html
+    Specifies which engine `pandas.read_excel` should use for parsing .xlsx
+    files. If `None`, sheets are streamed row by row in read-only mode,
+    keeping only the requested rows and columns, which is much lighter for
+    large sheets.
 
     default : `None`
 
@@ -161,6 +215,16 @@ def read_data(filename, scope = (globals(), locals()), **options):
         [0, 1, "Sheet5_n"]: 1st, 2nd and 5th sheet as a `dict` of DataFrames
         None: All sheets as a `dict` of DataFrames
 
+    Several sheets are read in parallel (see `processes`), and every one of
+    them is cached on its own.
+
+
+
+    `key` : *str or None; optional*
+
+    Group of an HDF5 file to read, if it has more than one.
+
+    default : `None`
 
 
     `cols` : *int or list or None; optional*
@@ -198,7 +262,7 @@ def read_data(filename, scope = (globals(), locals()), **options):
     `skipfooter` : *int; optional*
 
     Specifies the amount of rows to be skipped at the bottom of the file.
-    Not supported with C engine.
+    Not supported with C engine, so it makes 'auto' choose Python.
 
     default : `0`
 
@@ -206,6 +270,7 @@ def read_data(filename, scope = (globals(), locals()), **options):
     `ints` : *bool; optional*
 
     Specifies if Excel should convert integral floats into int (e.g. 1.0 to 1).
+    Otherwise, all the numbers of an Excel file are read as floats.
 
     default : `False`
 
@@ -217,123 +282,523 @@ def read_data(filename, scope = (globals(), locals()), **options):
     default : `False`
 
 
+    `cache` : *bool; optional*
+
+    Chooses whether to keep the parsed data in memory, so that reading the
+    same file again with the same options only copies it. Keeping it costs
+    a copy of every read (so that changes to the returned data don't reach
+    the cache), which only pays off for files read more than once. The
+    cache holds up to 256 MiB (least recently used files are dropped first)
+    and is emptied with `read_data.cache_clear()`. Files that changed since
+    they were cached (modification time or size) are parsed again.
+
+    default : `False`
+
+
+    `sidecar` : *bool or str; optional*
+
+    Chooses whether to also store the parsed data on disk as one `.npy`
+    file per column, which later runs map into memory instead of parsing
+    the file. With `True`, they're kept in a `.pylabutils_cache` directory
+    next to the file; a str gives another directory.
+
+    default : `False`
+
+
+    `chunksize` : *int or None; optional*
+
+    If given, the file is not read at once: an iterator is returned that
+    yields the data in chunks of (at most) `chunksize` rows, so files larger
+    than memory can be reduced chunk by chunk (e.g. with `bin_chunks` or
+    `fit_binned`). With `numeric`, every column of every chunk is float64,
+    so dtypes don't change between chunks. Only for text files with a
+    vertical layout; `dropna`, `cache`, `sidecar` and `skipfooter` don't
+    apply.
+
+    default : `None`
+
+
+    `arrays` : *bool; optional*
+
+    With `chunksize`, chooses whether to yield the chunks as 2D numpy arrays
+    (rows x columns) instead of DataFrames.
+
+    default : `False`
+
+
+    `threads` : *int or None; optional*
+
+    With several files, the amount of threads they're read with. If `None`,
+    as many as files, up to 4 more than CPUs (reading also waits on disk or
+    network).
+
+    default : `None`
+
+
+    `combine` : *`{'concat', 'dict'}`; optional*
+
+    With several files, chooses whether to concatenate them into a single
+    DataFrame or to return a dict of DataFrames keyed by file name.
+
+    default : `'concat'`
+
+
+    `source` : *str or None; optional*
+
+    With several files concatenated, name of the (categorical) column that
+    is added to tell which file every row comes from. If `None`, no column
+    is added.
+
+    default : `'source'`
+
+
+    `errors` : *`{'collect', 'raise'}`; optional*
+
+    With several files, chooses whether a file that can't be read stops the
+    whole load or is left out, with its exception collected in `errors`
+    (see below) and a warning. If no file can be read, the first error is
+    raised anyway.
+
+    default : `'collect'`
+
+
+    `processes` : *int or None; optional*
+
+    With several sheets of an Excel file, the amount of processes they're
+    read with. If `None`, as many as CPUs (but not more than sheets).
+
+    default : `None`
+
+
+    `downcast` : *bool; optional*
+
+    Chooses whether to store numeric columns in 32 bits when that loses
+    nothing: integer valued columns (without NaN) as int32 if they fit, and
+    float columns as float32 if every value survives the round trip. The
+    memory footprint of the parsed file and of the returned frame is in
+    `data.attrs['memory']` either way. Doesn't apply with `chunksize`.
+
+    default : `False`
+
+
     \> Returns:
 
-    The pandas.DataFrame containing the data.
+    The pandas.DataFrame containing the data. For text files, its `attrs`
+    hold the `engine` used and the `delim`, `decimal` and `header` that were
+    used (sniffed or given). `attrs['cache']` says where the data came from
+    (`'memory'`, `'sidecar'` or `None` if the file was parsed).
+
+    With `chunksize`, an iterator over the chunks instead.
+
+    With several files, the concatenated DataFrame (its `attrs['files']`
+    lists the files that were read) or a dict from file name to DataFrame.
+    Either way, the exceptions of the files that couldn't be read are in
+    `attrs['errors']` or in the `errors` attribute of the dict, keyed by
+    file name.
 
     """
 
     kwargs = dict(
         layout = 'vertical',
         delim = None,
+        header = 'auto',
         mod = False,
+        derive = None,
         numeric = True,
         dtype = None,
         astype = None,
         dropna = True,
-        decimal = '.',
+        decimal = None,
         thousands = '',
         encoding = 'utf-8',
         line_end = None,
-        engine = 'python',
+        engine = 'auto',
         excel_engine = None,
         squeeze = False,
         sheet_name = 0,
+        key = None,
         cols = None,
         nrows = None,
         skiprows = None,
         skipfooter = 0,
         ints = False,
         skipinitialspace = False,
+        cache = False,
+        sidecar = False,
+        chunksize = None,
+        arrays = False,
+        downcast = False,
+        threads = None,
+        combine = 'concat',
+        source = 'source',
+        errors = 'collect',
+        processes = None,
     )
 
-    defaults = copy.deepcopy(kwargs)
-
     kwargs.update(options)
 
+    filenames = _filenames(filename)
+    if filenames is not None:
+        return _read_files(filenames, scope, kwargs, options)
+    filename = os.fspath(filename)
+
+    if kwargs['chunksize']:
+        return _read_chunks(filename, scope, kwargs)
+
+    if _file_kind(filename) == 'excel' \
+            and not _single_sheet(kwargs['sheet_name']):
+        return _read_sheets(filename, scope, kwargs)
+
+    key, data, source = _from_cache(filename, kwargs)
+    if data is None:
+        data = _read_file(filename, kwargs)
+        _to_cache(key, data, kwargs)
+
+    data = _finish(data, scope, kwargs)
+    data.attrs['cache'] = source
+    return data
+
+
+read_data.cache_clear = _read_cache.clear
+
+# options applied after the cache, or about it
+_uncached_options = ['mod', 'derive', 'squeeze', 'cache', 'sidecar', 'chunksize',
+    'arrays', 'threads', 'combine', 'source', 'errors', 'processes']
+_files_options = ['threads', 'combine', 'source', 'errors']
+
+
+
+def _finish(data, scope, kwargs):
+    """
+    What is done to the data after the cache: derived columns, the
+    interactive ones (`mod`) and squeezing.
+    """
+    try:
+        scope[0].update(globals())
+        scope[1].update(locals())
+    except AttributeError:
+        pass
+
+    if kwargs['derive']:
+        _derive(data, kwargs['derive'], scope = scope)
+
+    if kwargs['mod']:
+        _add_cols(data, scope = scope)
+
+    if kwargs['squeeze'] and data.shape[1] == 1:
+        data = data.iloc[:, 0]
+    return data
+
+
+
+def _from_cache(filename, kwargs):
+    """
+    Looks a read up in the cache, in memory first and then in its sidecar.
+    Returns the cache key, the data (or `None`) and where it was found.
+    """
+    key = None
+    if _file_kind(filename) in ['parquet', 'feather', 'npz', 'hdf5']:
+        return key, None, None # already columnar, mapped when they can be
+    if kwargs['cache'] or kwargs['sidecar']:
+        key = _file_key(filename, {option: value for option, value \
+            in kwargs.items() if option not in _uncached_options})
+
+    if kwargs['cache']:
+        data = _read_cache.get(key)
+        if data is not None:
+            return key, data, 'memory'
+    if kwargs['sidecar']:
+        # mapped columns are not copied into memory, the OS caches them
+        data = _read_cache.load(key, kwargs['sidecar'])
+        if data is not None:
+            return key, data, 'sidecar'
+    return key, None, None
+
+
+
+def _to_cache(key, data, kwargs):
+    if key is None:
+        return
+    if kwargs['cache']:
+        _read_cache.put(key, data)
+    if kwargs['sidecar']:
+        _read_cache.save(key, kwargs['sidecar'], data)
+
+
+
+def _single_sheet(sheet_name):
+    return isinstance(sheet_name, (str, int))
+
+
+
+def _read_sheets(filename, scope, kwargs):
+    """
+    Reads several sheets of an Excel file, each one on its own process (and
+    cached on its own), and returns them in a dict.
+    """
+    sheets = _sheet_names(filename, kwargs['sheet_name'])
+    every_kwargs = {sheet: dict(kwargs, sheet_name = sheet) \
+        for sheet in sheets}
+
+    frames, keys, sources = {}, {}, {}
+    for sheet, sheet_kwargs in every_kwargs.items():
+        keys[sheet], frames[sheet], sources[sheet] = \
+            _from_cache(filename, sheet_kwargs)
+
+    missing = [sheet for sheet in sheets if frames[sheet] is None]
+    processes = min(kwargs['processes'] or os.cpu_count() or 1, len(missing))
+    if processes > 1:
+        with cf.ProcessPoolExecutor(max_workers = processes) as executor:
+            parsed = executor.map(_read_file, [filename] * len(missing),
+                [every_kwargs[sheet] for sheet in missing])
+            frames.update(zip(missing, parsed))
+    else:
+        frames.update({sheet: _read_file(filename, every_kwargs[sheet]) \
+            for sheet in missing})
+
+    for sheet in missing:
+        _to_cache(keys[sheet], frames[sheet], every_kwargs[sheet])
+
+    for sheet, data in frames.items():
+        frames[sheet] = data = _finish(data, scope, kwargs)
+        data.attrs['cache'] = sources[sheet]
+    return frames
+
+
+
+class _DataFiles(dict):
+    """
+    DataFrames of several files keyed by file name, with the exceptions of
+    the files that couldn't be read in `errors`.
+    """
+
+    def __init__(self, frames, errors):
+        super().__init__(frames)
+        self.errors = errors
+
+
+
+def _filenames(filename):
+    """
+    The files to read if `filename` is a glob pattern or a list of names, or
+    `None` if it is a single file.
+    """
+    if isinstance(filename, (list, tuple)):
+        return [os.fspath(name) for name in filename]
+
+    filename = os.fspath(filename)
+    if not glob.has_magic(filename):
+        return None
+    filenames = sorted(glob.glob(filename))
+    if not filenames:
+        raise FileNotFoundError(f"no file matches {filename!r}")
+    return filenames
+
+
+
+def _read_files(filenames, scope, kwargs, options):
+    """
+    Reads several files on a pool of threads and combines them. Columns are
+    added (`mod`) and squeezed once they're combined.
+    """
+    if kwargs['chunksize']:
+        raise ValueError("chunksize reads a single file at a time")
+    if kwargs['combine'] not in ['concat', 'dict']:
+        raise ValueError(f"unknown combine {kwargs['combine']!r}")
+
+    file_options = {option: value for option, value in options.items() \
+        if option not in _files_options}
+    file_options.update(mod = False, squeeze = False, derive = None)
+
+    threads = kwargs['threads'] \
+        or min(len(filenames), (os.cpu_count() or 1) + 4)
+    with cf.ThreadPoolExecutor(max_workers = max(threads, 1)) as executor:
+        futures = {name: executor.submit(read_data, name, ({}, {}),
+            **file_options) for name in dict.fromkeys(filenames)}
+
+    frames, errors = {}, {}
+    for name, future in futures.items():
+        try:
+            frames[name] = future.result()
+        except Exception as e:
+            if kwargs['errors'] == 'raise':
+                raise
+            errors[name] = e
+
+    if not frames:
+        raise next(iter(errors.values()))
+    if errors:
+        warnings.warn(f"{len(errors)} of {len(futures)} files couldn't be"
+            " read: " + ", ".join(f"{name} ({type(e).__name__}: {e})" \
+            for name, e in errors.items()))
+
+    if kwargs['combine'] == 'dict':
+        for name, data in frames.items():
+            frames[name] = _finish(data, scope, kwargs)
+        return _DataFiles(frames, errors)
+
+    data = pd.concat(frames.values(), ignore_index = True)
+    if kwargs['source'] is not None:
+        codes = np.repeat(np.arange(len(frames)),
+            [len(frame) for frame in frames.values()])
+        data.insert(0, kwargs['source'],
+            pd.Categorical.from_codes(codes, categories = list(frames)))
+
+    data = _finish(data, scope, kwargs)
+    data.attrs = dict(files = list(frames), errors = errors)
+    return data
+
+
+
+def _read_chunks(filename, scope, kwargs):
+    """
+    Checks that a file can be read in chunks and returns the iterator over
+    them.
+    """
+    if _file_kind(filename) != 'text':
+        raise ValueError("chunksize is only supported for text files")
+    if kwargs['layout'] in "horizontal||rows":
+        raise ValueError("a horizontal layout can not be read in chunks,"
+            " every column spans the whole file")
+    if kwargs['skipfooter']:
+        raise ValueError("skipfooter is not supported with chunksize")
+
+    return _iter_chunks(filename, scope, kwargs)
+
+
+
+def _iter_chunks(filename, scope, kwargs):
+    for chunk, read_info in _read_text_chunks(filename, kwargs):
+        if kwargs['numeric']:
+            chunk = chunk.apply(pd.to_numeric, errors = 'coerce') \
+                .astype('float64')
+
+        if kwargs['astype']:
+            chunk = chunk.astype(kwargs['astype'])
+
+        if kwargs['derive']:
+            _derive(chunk, kwargs['derive'], scope = scope)
+
+        if kwargs['arrays']:
+            yield chunk.to_numpy()
+        else:
+            chunk.attrs.update(read_info)
+            yield chunk
+
+
+
+def _read_file(filename, kwargs):
+    """
+    Parses a file with the options of `read_data`, up to the columns that
+    are added with `mod`.
+    """
     warnings.filterwarnings('ignore', category = pd.errors.ParserWarning)
     # ignore ParserWarning for engine choice
 
 
+    read_info = {}
+    transpose = kwargs['layout'] in "horizontal||rows"
+    kind = _file_kind(filename)
+
     # reading file as a dataframe with pandas
-    if filename.endswith('.xlsx'):
+    if kind == 'excel' and kwargs['excel_engine'] is None:
+        file_data = _read_excel(filename, kwargs)
+        read_info = dict(engine = 'openpyxl-stream')
+
+    elif kind == 'excel':
         file_data = pd.read_excel(filename,
             sheet_name = kwargs['sheet_name'],
+            header = 0 if kwargs['header'] == 'auto' else kwargs['header'],
             usecols = kwargs['cols'],
             engine = kwargs['excel_engine'],
             nrows = kwargs['nrows'],
             skiprows = kwargs['skiprows'],
             skipfooter = kwargs['skipfooter'],
-            thousands = kwargs['thousands'],
-            convert_float = kwargs['ints'],
-            skipinitialspace = kwargs['skipinitialspace'],
-            squeeze = kwargs['squeeze'],
+            thousands = kwargs['thousands'] or None,
             )
+        file_data = _excel_ints(file_data, kwargs['ints'])
+        read_info = dict(engine = kwargs['excel_engine'])
+
+    elif kind == 'text' and transpose and kwargs['numeric'] \
+            and kwargs['cols'] is None and kwargs['dtype'] is None:
+        # straight into numeric columns, there's nothing to transpose
+        file_data, read_info = _read_horizontal(filename, kwargs)
+        transpose = False
+
+    elif kind in ['parquet', 'feather', 'npz', 'hdf5']:
+        file_data, read_info = _read_binary(filename, kind, kwargs)
 
-    elif list(filter(filename.endswith, ['.csv', '.txt', '.md'])):
-        with codecs.open(filename, 'rU', kwargs['encoding']) as doc:
-            try:
-                file_data = pd.read_csv(doc,
-                    sep = kwargs['delim'] or ',',
-                    lineterminator = kwargs['line_end'],
-                    usecols = kwargs['cols'],
-                    dtype = kwargs['dtype'],
-                    engine = kwargs['engine'],
-                    nrows = kwargs['nrows'],
-                    skiprows = kwargs['skiprows'],
-                    skipfooter = kwargs['skipfooter'],
-                    decimal = kwargs['decimal'],
-                    thousands = kwargs['thousands'],
-                    skipinitialspace = kwargs['skipinitialspace'],
-                    squeeze = kwargs['squeeze'],
-                    )
-
-            except ValueError as e:
-                if "Unable to convert" in str(e):
-                    print("Invalid value encountered in file. Check if there"
-                          " are any inf, NaN, or similars in your data."
-                          " Columns longer than others can also be a problem.")
-                    raise e
-                else:
-                    raise e
+    elif kind == 'text':
+        if transpose and kwargs['header'] == 'auto':
+            kwargs['header'] = 0 # names are on the first column, always there
+        file_data, read_info = _read_text(filename, kwargs)
 
     else:
         raise TypeError("file type readability not yet implemented.")
 
-    # second part of criteria for reading files: allow horizontality
-    temp = copy.deepcopy(file_data)
+    parsed_bytes = _nbytes(file_data)
 
+    # second part of criteria for reading files: allow horizontality
     # default layout is vertical||columns which requires no action
-    if kwargs['layout'] in "horizontal||rows":
+    if transpose:
         lead_key = file_data.keys()[0]
-        temp = file_data \
+        file_data = file_data \
                 .set_index(lead_key) \
                 .T.rename_axis(lead_key) \
-                .rename_axis(None, 1) \
+                .rename_axis(None, axis = 1) \
                 .reset_index()
 
         del lead_key
 
+    # from here on, columns are replaced one at a time, never the whole frame
+    data = file_data
+    del file_data
+
     if kwargs['numeric']:
-        temp = temp.apply(pd.to_numeric, errors = 'coerce')
+        for name in data.columns:
+            if not is_numeric_dtype(data[name]):
+                data[name] = pd.to_numeric(data[name], errors = 'coerce')
 
     if kwargs['astype']:
-        temp = temp.astype(kwargs['astype'])
+        data = data.astype(kwargs['astype'])
 
     if kwargs['dropna']:
-        temp = temp.dropna(axis = 1, how = 'all')
+        empty = data.columns[data.isna().all().to_numpy()]
+        if len(empty):
+            data.drop(columns = empty, inplace = True)
 
+    if kwargs['downcast']:
+        _downcast(data)
 
-    data = copy.deepcopy(temp)
-    del temp
+    data.attrs.update(read_info)
+    data.attrs['memory'] = dict(parsed = parsed_bytes, final = _nbytes(data))
+    return data
 
-    try:
-        scope[0].update(globals())
-        scope[1].update(locals())
-    except AttributeError:
-        pass
 
-    if kwargs['mod']:
-        _add_cols(data, scope = scope)
 
-    return data
+def _nbytes(data):
+    return int(data.memory_usage(index = True, deep = True).sum())
+
+
+
+def _downcast(data):
+    """
+    Stores the columns of `data` in 32 bits where no value changes: floats
+    with integer values (and no NaN) and 64 bit ints as int32 if they fit,
+    other floats as float32 if they round trip exactly.
+    """
+    int32 = np.iinfo(np.int32)
+    for name in data.columns:
+        values = data[name].to_numpy()
+        if values.dtype.kind not in 'fi' or values.dtype.itemsize <= 4:
+            continue
+
+        finite = np.isfinite(values) if values.dtype.kind == 'f' else True
+        if np.all(finite) and len(values) \
+                and int32.min <= values.min() and values.max() <= int32.max \
+                and np.array_equal(values, np.round(values)):
+            data[name] = values.astype(np.int32)
+        elif values.dtype.kind == 'f' and np.array_equal(
+                values.astype(np.float32).astype(values.dtype), values,
+                equal_nan = True):
+            data[name] = values.astype(np.float32)
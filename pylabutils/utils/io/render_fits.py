@@ -0,0 +1,252 @@
+import os
+import copy
+import concurrent.futures as cf
+
+import numpy as np
+import matplotlib
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from ._plot_fit import _plot_fit_defaults, _graph_series, _graph_texts, \
+    _draw_graph, _figure_name
+from ._tex_render import _set_tex_cache, _resolve_usetex, _axes_texts, \
+    _warm_tex_cache, _Timings
+
+
+__all__ = ['render_fits']
+
+
+
+def _render_job(job):
+    """
+    Draws and saves the graphs of one fit using `matplotlib.figure.Figure`
+    on an Agg canvas, without touching the pyplot state. Every figure is
+    cleared as soon as it has been saved. Returns the saved file names and
+    the time spent in each stage of every figure.
+    """
+    kw = _plot_fit_defaults()
+    defaults = copy.deepcopy(kw)
+    kw.update(job['options'])
+
+    usetex = job['rc']['text.usetex']
+    if usetex and kw['tex_cache']:
+        _set_tex_cache(kw['tex_cache'])
+
+    saved = []
+    figure_timings = []
+    figures = []
+    timings = _Timings()
+    with matplotlib.rc_context(job['rc']):
+        try:
+            with timings.stage('series'):
+                series = _graph_series(job['xdata'], job['ydata'], kw)
+            if series is None:
+                return dict(saved = saved, timings = figure_timings)
+
+            graphs = series['graphs']
+            for i, j in enumerate(graphs):
+                if kw['split'] == True or not figures:
+                    with timings.stage('figure'):
+                        figure = Figure(figsize = kw['sizes'][i] \
+                            if kw['sizes'] != defaults['sizes'] \
+                            else defaults['sizes'][j])
+                        FigureCanvasAgg(figure)
+                        ax = figure.add_subplot()
+                    figures.append(figure)
+
+                with timings.stage('artists'):
+                    _draw_graph(ax, i, j, series, kw, defaults)
+
+                if usetex:
+                    with timings.stage('tex'):
+                        _warm_tex_cache(_axes_texts(ax))
+
+                figname = _figure_name(kw['save'], kw['split'], i, graphs)
+                if figname is not None and \
+                        (kw['split'] == True or i == len(graphs) - 1):
+                    # unsplit graphs share one figure, saved once at the end
+                    with timings.stage('save'):
+                        figure.savefig(figname)
+                    saved.append(figname)
+
+                if kw['split'] == True or i == len(graphs) - 1:
+                    figure.clear()
+                    figure_timings.append(timings)
+                    timings = _Timings()
+
+        finally:
+            for figure in figures:
+                figure.clear()
+            figures.clear()
+
+    return dict(saved = saved, timings = figure_timings)
+
+
+
+def _render_payload(job, name, save, options):
+    """
+    Builds the picklable description of one rendering job from a
+    `(result, xdata, ydata[, yerr[, xerr]])` tuple or an equivalent dict.
+    """
+    if isinstance(job, dict):
+        job = [job.get(key) for key in \
+            ['result', 'xdata', 'ydata', 'yerr', 'xerr']]
+    result, xdata, ydata, yerr, xerr = (list(job) + [None] * 2)[:5]
+
+    func_str = result if type(result) == str else result.fit_func
+    if type(func_str) != str:
+        raise ValueError("every job needs a fit result with a function")
+
+    if type(save) == str:
+        if '{}' not in save:
+            root, ext = os.path.splitext(save)
+            save = root + '{}' + ext
+        save = save.format(name)
+
+    job_options = dict(options)
+    job_options.update(
+        func_str = func_str,
+        fit_result = None if type(result) == str else result,
+        yerr = yerr,
+        xerr = xerr,
+        save = save,
+    )
+
+    return dict(
+        xdata = np.asarray(xdata),
+        ydata = np.asarray(ydata),
+        options = job_options,
+        rc = {
+            'text.usetex' : _resolve_usetex(options['usetex'],
+                _graph_texts(job_options)),
+            'font.family' : options['font_family'],
+        },
+    )
+
+
+
+def render_fits(jobs, **options):
+    """
+    Renders and saves the graphs of many fits without a display, using the
+    object-oriented Figure API on the Agg backend (no pyplot state, no
+    `plt.show()`), optionally across a pool of processes. Figures are
+    closed as soon as they are saved.
+
+
+    \> Parameters:
+
+    `jobs` : *N x tuple or N x dict*
+
+    The fits to render, as `(result, xdata, ydata[, yerr[, xerr]])` tuples
+    or as dicts with those keys, where `result` is the `FitResult` returned
+    by `fit` (or the fit function string with the values in it). As in
+    `fit_batch`, the functions are evaluated without the caller's `scope`,
+    so they can only use numpy (as `np` or `numpy`) besides the variable.
+
+
+    `save` : *str or N x str; optional*
+
+    File name for the graphs of each fit. A string is used as a template
+    where `{}` is replaced by the name of each fit (it is added before the
+    extension if missing). The `_data`, `_curve` and `_fit_data` suffixes
+    are added as in `fit`.
+
+    default : `'fit{}.pdf'`
+
+
+    `names` : *N x str; optional*
+
+    Names of the fits, used in the `save` template.
+
+    default : `0, 1, ..., N-1`
+
+
+    `processes` : *int or None; optional*
+
+    Amount of worker processes. If `None`, as many as CPUs. With `1`, the
+    graphs are rendered in the current process.
+
+    default : `None`
+
+
+    `usetex` : *bool or 'auto'; optional*
+
+    Chooses whether to use the TeX engine to render text inside the graphs.
+    With `'auto'`, TeX is only used for the fits whose titles or labels need
+    it; mathtext renders the rest.
+
+    default : `False`
+
+
+    `tex_cache` : *str or None; optional*
+
+    Directory shared by all the workers where the rendered TeX fragments are
+    cached, by a hash of their content.
+
+    default : `None` (matplotlib's cache directory)
+
+
+    `timings` : *bool; optional*
+
+    Chooses whether to also return the time spent in each stage of every
+    figure (computing the curve, creating the figure and the artists,
+    running TeX and saving).
+
+    default : `False`
+
+
+    `font_family` : *str; optional*
+
+    Font family used to render text.
+
+    default : `'serif'`
+
+
+    \> Other options:
+
+    Every graphical option of `fit` (graph, split, sizes, colors, titles,
+    labels, axis_labels, legend, errorbars, ...).
+
+
+    \> Returns:
+
+    A list with the names of the saved files of every fit. If `timings`, a
+    list of dicts with the keys `'saved'` and `'timings'` instead.
+
+    """
+
+    kwargs = _plot_fit_defaults()
+    kwargs.update(
+        save = 'fit{}.pdf',
+        names = None,
+        processes = None,
+        usetex = False,
+        font_family = 'serif',
+        timings = False,
+    )
+
+    kwargs.update(options)
+
+    jobs = list(jobs)
+    names = kwargs.pop('names')
+    if names is None:
+        names = range(len(jobs))
+    processes = kwargs.pop('processes')
+    timings = kwargs.pop('timings')
+    save = kwargs.pop('save')
+    saves = save if type(save) == list else [save] * len(jobs)
+
+    payloads = [_render_payload(job, name, job_save, kwargs) \
+        for job, name, job_save in zip(jobs, names, saves)]
+
+    if processes == 1 or len(payloads) <= 1:
+        rendered = [_render_job(payload) for payload in payloads]
+    else:
+        with cf.ProcessPoolExecutor(max_workers = processes) as executor:
+            rendered = list(executor.map(_render_job, payloads,
+                chunksize = max(1, len(payloads) // (4 * (processes \
+                    or os.cpu_count() or 1)))))
+
+    if timings:
+        return rendered
+    return [job['saved'] for job in rendered]
@@ -1,3 +1,5 @@
+import pandas as pd
+
 __all__ = ['tex_table']
 
 
@@ -18,21 +20,23 @@ _tex_table_values = dict(
     )
 
 
-def tex_table(data, data_titles, **options) -> str:
+def tex_table(data, data_titles = None, **options) -> str:
     """
     Generates a simple Latex table containing numeric data.
 
 
     \> Parameters:
 
-    `data` : *N x array-like*
+    `data` : *N x array-like or pandas.DataFrame*
 
-    Data that will be presented in the table.
+    Data that will be presented in the table. A `DataFrame` (such as the one
+    from `FitStore.to_dataframe`) gives one table column per column.
 
 
-    `data_titles` : *N x str, array-like*
+    `data_titles` : *N x str, array-like; optional if `data` is a DataFrame*
 
-    Titles for the given data.
+    Titles for the given data. For a `DataFrame`, its column names by
+    default.
 
 
     `prec` : *int or N x int, array-like; optional*
@@ -125,6 +129,11 @@ def tex_table(data, data_titles, **options) -> str:
     """
 
 
+    if isinstance(data, pd.DataFrame):
+        if data_titles is None:
+            data_titles = [str(column) for column in data.columns]
+        data = [data[column].tolist() for column in data.columns]
+
     kwargs = dict(
         prec = [2 if any(['.' in str(num) for num in data_list]) \
             else 0 for data_list in data],
@@ -0,0 +1,169 @@
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from ._compression import _file_kind
+from ._read_binary import _require
+
+__all__ = ['write_data']
+
+
+
+def _npz_columns(data):
+    """
+    Arrays of the columns of `data` for an `.npz` file, with text as fixed
+    width unicode (python objects could only be pickled).
+    """
+    columns = {}
+    for name in data.columns:
+        column = data[name]
+        if is_numeric_dtype(column) or column.dtype.kind in 'bMm':
+            columns[str(name)] = column.to_numpy()
+        else:
+            columns[str(name)] = column.astype(str).to_numpy(dtype = str)
+    return columns
+
+
+
+def write_data(data, filename, **options):
+    """
+    Writes a table of data to a file, in a format chosen by its extension,
+    so that `read_data` can load it again. Columnar binary formats reload
+    almost instantly, which makes them the best choice for intermediate
+    results:
+
+    `>>> write_data(data, 'processed.feather')`
+
+    `>>> data = read_data('processed.feather')`
+
+
+    \> Parameters:
+
+    `data` : *pandas.DataFrame or dict of array-like*
+
+    The data, with a column per variable.
+
+
+    `filename` : *str*
+
+    Name of the file. Its extension chooses the format: `.csv`, `.txt` or
+    `.md` (text, optionally compressed as in `read_data`, e.g.
+    `'data.csv.gz'`), `.xlsx`, `.parquet` (needs pyarrow or fastparquet),
+    `.feather` (needs pyarrow), `.npz` or `.h5` (needs PyTables).
+
+
+    `layout` : *str; optional*
+
+    With `'horizontal'`, text and Excel files get a variable per row (its
+    name first), as `read_data` reads them with the same option.
+
+    default : `'vertical'`
+
+
+    `cols` : *list or None; optional*
+
+    Columns to write. If `None`, all of them.
+
+    default : `None`
+
+
+    `astype` : *str or dtype or None; optional*
+
+    Type the data is converted to before writing it.
+
+    default : `None`
+
+
+    `delim` : *str; optional*
+
+    Delimiter of text files.
+
+    default : `','`
+
+
+    `compressed` : *bool; optional*
+
+    Chooses whether to compress `.npz` (zip) and `.feather` (LZ4) files.
+    Uncompressed ones are mapped into memory by `read_data` instead of
+    read.
+
+    default : `False`
+
+
+    `key` : *str; optional*
+
+    Group of HDF5 files the data is written to. It is written as a table,
+    so that columns can be read on their own.
+
+    default : `'data'`
+
+
+    `sheet_name` : *str; optional*
+
+    Name of the sheet of Excel files.
+
+    default : `'Sheet1'`
+
+    """
+
+    kwargs = dict(
+        layout = 'vertical',
+        cols = None,
+        astype = None,
+        delim = ',',
+        compressed = False,
+        key = 'data',
+        sheet_name = 'Sheet1',
+    )
+
+    kwargs.update(options)
+
+    data = pd.DataFrame(data)
+    if kwargs['cols'] is not None:
+        data = data[list(kwargs['cols'])]
+    if kwargs['astype']:
+        data = data.astype(kwargs['astype'])
+
+    filename = os.fspath(filename)
+    kind = _file_kind(filename)
+    horizontal = kwargs['layout'] in "horizontal||rows"
+    if horizontal and kind not in ['text', 'excel']:
+        raise ValueError(f"{kind} files are columnar, they can only be"
+            " written with a vertical layout")
+
+    if kind == 'text':
+        if horizontal:
+            data.T.to_csv(filename, sep = kwargs['delim'], header = False)
+        else:
+            data.to_csv(filename, sep = kwargs['delim'], index = False)
+
+    elif kind == 'excel':
+        if horizontal:
+            data.T.to_excel(filename, sheet_name = kwargs['sheet_name'],
+                header = False)
+        else:
+            data.to_excel(filename, sheet_name = kwargs['sheet_name'],
+                index = False)
+
+    elif kind == 'parquet':
+        _require('pyarrow', 'fastparquet', what = "writing Parquet files")
+        data.to_parquet(filename, index = False)
+
+    elif kind == 'feather':
+        _require('pyarrow', what = "writing Feather files")
+        data.reset_index(drop = True).to_feather(filename,
+            compression = 'lz4' if kwargs['compressed'] else 'uncompressed')
+
+    elif kind == 'npz':
+        save = np.savez_compressed if kwargs['compressed'] else np.savez
+        save(filename, **_npz_columns(data))
+
+    elif kind == 'hdf5':
+        _require('tables', what = "writing HDF5 files")
+        data.to_hdf(filename, key = kwargs['key'], format = 'table',
+            index = False)
+
+    else:
+        raise TypeError("file type writability not yet implemented.")
@@ -14,7 +14,7 @@ setuptools.setup(
     license = 'MIT',
     classifiers = [
         'Development Status :: 5 - Production/Stable',
-        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
         'Intended Audience :: Science/Research',
         'Intended Audience :: Education',
         'Topic :: Utilities',
@@ -27,6 +27,6 @@ setuptools.setup(
     packages = setuptools.find_packages(),
     py_modules = [],
     install_requires = ['numpy', 'matplotlib', 'scipy'],
-    python_requires = '~=3.7',
+    python_requires = '~=3.8',
     include_package_data = True,
 )
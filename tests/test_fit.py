@@ -0,0 +1,26 @@
+import sys
+
+import numpy as np
+import pytest
+
+from pylabutils.numfit import fit
+
+
+
+@pytest.mark.parametrize('fit_method', ['simple', 'odr'])
+def test_explicit_fit_method_keeps_the_fit_unbounded(fit_method, monkeypatch):
+    # the beta0 search is bounded by the data range (100 here), the fit not
+    x = np.linspace(0, .1, 30)
+    y = 1000 * x + np.random.default_rng(0).normal(0, .01, x.size)
+
+    module = sys.modules['pylabutils.numfit.fit']
+    curve_fit, given = module.so.curve_fit, []
+    def _curve_fit(*args, **kwargs):
+        given.append(kwargs['bounds'])
+        return curve_fit(*args, **kwargs)
+    monkeypatch.setattr(module.so, 'curve_fit', _curve_fit)
+
+    result = fit('{a}*x', x, y, bounds = None, fit_method = fit_method)
+
+    assert result.values[0] == pytest.approx(1000, rel = 1e-3)
+    assert all(bounds == (-np.inf, np.inf) for bounds in given)